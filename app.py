@@ -1,12 +1,28 @@
 # -*- coding: utf-8 -*-
-from flask import Flask, render_template, redirect, url_for, session
+import hmac
+import os
+
+from flask import Flask, render_template, redirect, url_for, session, request, Response
 from datetime import timedelta
-from config import SECRET_KEY
+from config import SECRET_KEY, METRICS_TOKEN, HEALTH_MONITOR_ENABLED
 from auth import auth_bp           # login/logout blueprint
 from users import users_bp         # users CRUD blueprint
-from db import get_db              # MySQL bağlantısı
+from db import init_app as init_db  # MySQL bağlantı havuzu
 from datasources import datasources_bp  # datasources blueprint
-from checkpoints import checkpoints_bp
+from datasources.health import monitor as health_monitor
+from checkpoints.routes import checkpoints_bp
+from checkpoints.search import ensure_indexes as ensure_search_indexes
+import versions
+import metrics
+
+
+def _is_reloader_parent():
+    """
+    `python app.py` (debug=True) iki process açar: parent yalnızca dosyaları
+    izler, asıl sunucu WERKZEUG_RUN_MAIN ile başlatılan child'dır.
+    """
+    return __name__ == "__main__" and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+
 
 def create_app():
     app = Flask(__name__)
@@ -14,6 +30,22 @@ def create_app():
     app.permanent_session_lifetime = timedelta(hours=8)
     app.config["TEMPLATES_AUTO_RELOAD"] = True
 
+    # Repo bağlantıları request sonunda havuza iade edilir
+    init_db(app)
+
+    # Versions banner'ı ilk login'den önce cache'e alınır (repo erişilemiyorsa sessizce geçer)
+    with app.app_context():
+        versions.warm()
+        # Checkpoint listesinin arama indeksleri (yoksa) kurulur, bkz. checkpoints/search.py
+        ensure_search_indexes()
+
+    # Template render süreleri /metrics'e yazılır
+    metrics.init_app(app)
+
+    # Datasource sağlık durumu arka planda tazelenir (reloader parent'ında değil)
+    if HEALTH_MONITOR_ENABLED and not _is_reloader_parent():
+        health_monitor.start()
+
     # Blueprint kayıtları
     app.register_blueprint(auth_bp)
     app.register_blueprint(users_bp)        # url_prefix users/__init__.py içinde zaten var
@@ -36,20 +68,27 @@ def create_app():
         if "user" not in session:
             return redirect(url_for("auth.login"))
 
-        # Versions tablosundan verileri al (varsayılan davranışın)
+        # Versions tablosundan verileri al (TTL cache'li, bkz. versions.py)
         try:
-            with get_db().cursor() as cur:
-                cur.execute("SELECT line FROM versions")
-                versions = [r["line"] for r in cur.fetchall()]
+            version_lines = versions.get_versions()
         except Exception as e:
-            versions = [f"Version info unavailable ({e})"]
+            version_lines = [f"Version info unavailable ({e})"]
 
         return render_template(
             "index.html",
             user=session["user"],
-            versions=versions
+            versions=version_lines
         )
 
+    # Prometheus text formatında süre histogramları; login ya da METRICS_TOKEN gerekir
+    @app.route("/metrics")
+    def metrics_endpoint():
+        token_ok = bool(METRICS_TOKEN) and hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}")
+        if not token_ok and "user" not in session:
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+        return Response(metrics.render_all(), mimetype="text/plain; version=0.0.4")
+
     return app
 
 
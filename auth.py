@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from werkzeug.security import check_password_hash
-from db import get_db, get_version_line
+from db import get_db
+from versions import get_version_line
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark'lar. Gerçek veritabanı gerektirmez; bkz. bench/scan_bench.py.
+"""
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+oracledb / pyodbc yerine geçen sahte DB-API sürücüleri.
+
+install(profile) iki sahte modülü sys.modules'a yerleştirir; engine'deki
+`import oracledb` / `import pyodbc` bunları alır. Gecikme, sonuç boyutu ve
+hata oranı Profile ile ayarlanır:
+
+    profile = Profile(connect_ms=50, query_ms=5, detail_rows=1000, fail_rate=0.01)
+    install(profile)
+"""
+import random
+import re
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass
+
+
+@dataclass
+class Profile:
+    connect_ms: float = 20.0        # login süresi
+    query_ms: float = 2.0           # execute başına round trip
+    jitter: float = 0.2             # gecikmelere eklenen ± oran
+    detail_rows: int = 100          # scalar olmayan sorguların satır sayısı
+    fail_rate: float = 0.0          # execute'un hata verme olasılığı
+    slow_rate: float = 0.0          # execute'un slow_ms sürme olasılığı (runaway sorgu)
+    slow_ms: float = 5000.0
+    connect_fail_rate: float = 0.0
+    seed: int = 42
+
+
+class FakeDatabaseError(Exception):
+    pass
+
+
+_BATCH_COLUMN = re.compile(r"\)\s+AS\s+c\d+", re.IGNORECASE)
+_SCALAR = re.compile(r"^\s*select\s+(count|max|min|sum|\d)", re.IGNORECASE)
+
+
+class _State:
+    def __init__(self, profile):
+        self.profile = profile
+        self._rng = random.Random(profile.seed)
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.executes = 0
+
+    def chance(self, rate):
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def sleep(self, ms):
+        if ms <= 0:
+            return
+        with self._lock:
+            factor = 1 + self._rng.uniform(-self.profile.jitter, self.profile.jitter)
+        time.sleep(ms * factor / 1000.0)
+
+
+class FakeCursor:
+
+    def __init__(self, state, conn):
+        self._state = state
+        self._conn = conn
+        self._rows = []
+        self._pos = 0
+        self.description = None
+        self.arraysize = 100
+        self.timeout = 0
+
+    def execute(self, sql, *args):
+        st = self._state
+        with st._lock:
+            st.executes += 1
+        latency = st.profile.slow_ms if st.chance(st.profile.slow_rate) else st.profile.query_ms
+        limit_ms = self._conn.call_timeout or (self._conn.timeout * 1000)
+        if limit_ms and latency > limit_ms:
+            # Sürücü zaman aşımı: oracledb DPI-1067 gibi davranır
+            st.sleep(limit_ms)
+            raise FakeDatabaseError(f"DPI-1067: call timeout of {limit_ms} ms exceeded (simulated)")
+        st.sleep(latency)
+        if st.chance(st.profile.fail_rate):
+            raise FakeDatabaseError("ORA-00942: table or view does not exist (simulated)")
+
+        columns = len(_BATCH_COLUMN.findall(sql))
+        if columns:                                 # engine.run_batch birleşik sorgusu
+            self._set([tuple(1 for _ in range(columns))], [f"C{i}" for i in range(columns)])
+        elif _SCALAR.match(sql):
+            self._set([(1,)], ["VALUE"])
+        else:
+            n = st.profile.detail_rows
+            self._set([(i, f"name_{i}", "OPEN") for i in range(n)], ["ID", "NAME", "STATUS"])
+        return self
+
+    def _set(self, rows, cols):
+        self._rows = rows
+        self._pos = 0
+        self.description = [(c, None, None, None, None, None, None) for c in cols]
+
+    def fetchone(self):
+        if self._pos >= len(self._rows):
+            return None
+        self._pos += 1
+        return self._rows[self._pos - 1]
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return rows
+
+    def nextset(self):
+        return None
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        self._rows = []
+
+
+class FakeConnection:
+
+    def __init__(self, state):
+        self._state = state
+        self.closed = False
+        self.call_timeout = 0
+        self.timeout = 0
+
+    def cursor(self):
+        if self.closed:
+            raise FakeDatabaseError("connection closed")
+        return FakeCursor(self._state, self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def _connect(state):
+    with state._lock:
+        state.connects += 1
+    state.sleep(state.profile.connect_ms)
+    if state.chance(state.profile.connect_fail_rate):
+        raise FakeDatabaseError("ORA-12541: TNS:no listener (simulated)")
+    return FakeConnection(state)
+
+
+def install(profile=None):
+    """Sahte oracledb ve pyodbc modüllerini kurar; sayaçları tutan state'i döner."""
+    state = _State(profile or Profile())
+
+    oracledb = types.ModuleType("oracledb")
+    oracledb.DatabaseError = FakeDatabaseError
+    oracledb.makedsn = lambda host, port, service_name=None, sid=None: f"{host}:{port}/{service_name or sid}"
+    oracledb.connect = lambda user=None, password=None, dsn=None, **kw: _connect(state)
+
+    pyodbc = types.ModuleType("pyodbc")
+    pyodbc.Error = FakeDatabaseError
+    pyodbc.connect = lambda conn_str, **kw: _connect(state)
+
+    sys.modules["oracledb"] = oracledb
+    sys.modules["pyodbc"] = pyodbc
+    return state
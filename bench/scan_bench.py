@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Scan throughput benchmark'ı (gerçek veritabanı olmadan).
+
+Sahte sürücülerle (bench/fakedb.py) fleet scan yolunu uçtan uca çalıştırır:
+havuz, paralel dispatcher, batch'li SQL_Test, Pre SQL, condition.
+Her datasource sayısı için checks/s, checkpoint süresi p50/p99 ve
+tracemalloc tepe belleği raporlanır.
+
+    python -m bench.scan_bench
+    python -m bench.scan_bench --datasources 1,10,100 --checkpoints 200 --query-ms 5 --json
+"""
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+
+from bench.fakedb import Profile, install
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def make_checkpoints(count, db_type, pre_sql_every=10):
+    """Çoğu skaler, bir kısmı Pre SQL'li checkpoint seti."""
+    checkpoints = []
+    for i in range(count):
+        cp = {
+            "id": i + 1,
+            "name": f"bench_{db_type}_{i:04d}",
+            "db_type": db_type,
+            "severity": "medium",
+            "sql_test": f"SELECT COUNT(*) FROM bench_table_{i}",
+            "test_condition": "> 0" if i % 3 else "== 1",
+        }
+        if pre_sql_every and i % pre_sql_every == 0:
+            cp["pre_sql_test"] = "ALTER SESSION SET NLS_DATE_FORMAT = 'YYYY-MM-DD'"
+        checkpoints.append(cp)
+    return checkpoints
+
+
+def make_datasources(count, hosts):
+    db_types = ("oracle", "mssql")
+    return [
+        {
+            "id": i + 1,
+            "name": f"bench_ds_{i:03d}",
+            "db_type": db_types[i % 2],
+            "host": f"bench-host-{i % max(1, hosts)}",
+            "port": 1521 if i % 2 == 0 else 1433,
+            "auth_mode": "sql",
+            "username": "bench",
+            "password": "bench",
+            "oracle_service_name": "BENCH",
+            "database_name": "bench",
+        }
+        for i in range(count)
+    ]
+
+
+def run_once(n_datasources, n_checkpoints, args):
+    from checkpoints import engine
+    from checkpoints.fleet import scan_fleet
+    from checkpoints.pool import TargetConnectionPool
+
+    # Her koşu soğuk havuzla başlar
+    engine.target_pool = TargetConnectionPool()
+
+    datasources = make_datasources(n_datasources, args.hosts or n_datasources)
+    checkpoints = (make_checkpoints(n_checkpoints, "oracle", args.pre_sql_every)
+                   + make_checkpoints(n_checkpoints, "mssql", args.pre_sql_every))
+
+    durations = []
+    statuses = {}
+
+    def on_result(ds, res):
+        if res.get("duration_ms") is not None:
+            durations.append(res["duration_ms"])
+        statuses[res["status"]] = statuses.get(res["status"], 0) + 1
+
+    tracemalloc.start()
+    started = time.monotonic()
+    scan_fleet(datasources, checkpoints, max_workers=args.workers,
+               max_per_host=args.per_host, on_result=on_result,
+               deadline_seconds=args.deadline)
+    elapsed = time.monotonic() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    checks = sum(statuses.values())
+    durations.sort()
+    return {
+        "datasources": n_datasources,
+        "checks": checks,
+        "seconds": round(elapsed, 3),
+        "checks_per_s": round(checks / elapsed, 1) if elapsed else None,
+        "p50_ms": _percentile(durations, 50),
+        "p99_ms": _percentile(durations, 99),
+        "peak_mem_kb": round(peak / 1024, 1),
+        "statuses": statuses,
+    }
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Offline scan benchmark with simulated Oracle/MSSQL drivers.")
+    ap.add_argument("--datasources", default="1,10,100",
+                    help="comma separated datasource counts (default: 1,10,100)")
+    ap.add_argument("--checkpoints", type=int, default=100, help="checkpoints per db_type")
+    ap.add_argument("--connect-ms", type=float, default=20.0)
+    ap.add_argument("--query-ms", type=float, default=2.0)
+    ap.add_argument("--detail-rows", type=int, default=100)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="per-execute failure probability")
+    ap.add_argument("--connect-fail-rate", type=float, default=0.0)
+    ap.add_argument("--slow-rate", type=float, default=0.0, help="probability of a runaway query")
+    ap.add_argument("--slow-ms", type=float, default=5000.0)
+    ap.add_argument("--check-timeout", type=float, default=None, help="override CHECK_TIMEOUT_SECONDS")
+    ap.add_argument("--deadline", type=float, default=None, help="override SCAN_DEADLINE_SECONDS")
+    ap.add_argument("--pre-sql-every", type=int, default=10, help="every Nth checkpoint has Pre SQL (0 = none)")
+    ap.add_argument("--batch-size", type=int, default=None, help="override SCAN_BATCH_SIZE (0 = no batching)")
+    ap.add_argument("--workers", type=int, default=None, help="override FLEET_MAX_WORKERS")
+    ap.add_argument("--per-host", type=int, default=None, help="override FLEET_MAX_PER_HOST")
+    ap.add_argument("--hosts", type=int, default=0, help="distinct hosts (default: one per datasource)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    state = install(Profile(
+        connect_ms=args.connect_ms,
+        query_ms=args.query_ms,
+        detail_rows=args.detail_rows,
+        fail_rate=args.fail_rate,
+        connect_fail_rate=args.connect_fail_rate,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        seed=args.seed,
+    ))
+
+    if args.check_timeout is not None:
+        from checkpoints import engine
+        engine.CHECK_TIMEOUT_SECONDS = args.check_timeout
+
+    if args.batch_size is not None:
+        from checkpoints import engine
+        engine.SCAN_BATCH_SIZE = args.batch_size
+
+    results = []
+    for n in [int(x) for x in args.datasources.split(",") if x.strip()]:
+        res = run_once(n, args.checkpoints, args)
+        results.append(res)
+        if args.json:
+            print(json.dumps(res))
+            sys.stdout.flush()
+
+    if not args.json:
+        print(f"{'datasources':>11} {'checks':>7} {'seconds':>8} {'checks/s':>9} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'peak KB':>9}  statuses")
+        for r in results:
+            print(f"{r['datasources']:>11} {r['checks']:>7} {r['seconds']:>8} {r['checks_per_s']:>9} "
+                  f"{r['p50_ms']:>8} {r['p99_ms']:>8} {r['peak_mem_kb']:>9}  {r['statuses']}")
+        print(f"\nfake driver: {state.connects} connects, {state.executes} executes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
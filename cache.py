@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Process içi cache'ler.
+
+- TTLCache: basit, thread-safe TTL + LRU cache.
+- VersionedCatalog: repo'daki cache_versions sayacıyla tutarlı tutulan,
+  id ve db_type'a göre indekslenmiş tablo kopyası.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from db import get_db, get_cache_version, bump_cache_version
+
+
+class TTLCache:
+    """
+    maxsize'ı aşınca en az kullanılan girişi atar; ttl saniyeden eski
+    girişler okunurken düşürülür.
+    """
+
+    def __init__(self, maxsize=1000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()      # key -> (expires_at, stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            if item[0] <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return item[2]
+
+    def age(self, key):
+        """Girişin kaç saniye önce yazıldığı; yoksa None."""
+        with self._lock:
+            item = self._data.get(key)
+            return None if item is None else time.monotonic() - item[1]
+
+    def set(self, key, value, ttl=None):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + (self.ttl if ttl is None else ttl), now, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[2]
+
+    def invalidate(self, predicate):
+        """predicate(key) True olan girişleri siler; silinen adet döner."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class VersionedCatalog:
+    """
+    `sql` ile yüklenen satırları `id`'ye ve `db_type`'a göre indeksler.
+
+    İlk kullanımda yüklenir; repo'daki `name` sayacı değişince (başka bir
+    worker yazdığında) yeniden yüklenir. Sayaç en fazla check_interval
+    saniyede bir okunur. Dönen dict'ler paylaşılır; çağıran değiştirmemeli
+    (get() kopya döner).
+    """
+
+    def __init__(self, name, sql, check_interval):
+        self.name = name
+        self.sql = sql
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._by_id = None
+        self._by_type = {}
+
+    def _load(self):
+        with get_db() as con, con.cursor() as cur:
+            cur.execute(self.sql)
+            rows = cur.fetchall()
+        by_id, by_type = {}, {}
+        for row in rows:
+            by_id[row["id"]] = row
+            by_type.setdefault((row["db_type"] or "").lower(), []).append(row)
+        return by_id, by_type
+
+    def _fresh(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._by_id is not None and now - self._checked_at < self.check_interval:
+                return self._by_id, self._by_type
+
+            version = get_cache_version(self.name)
+            if self._by_id is None or version != self._version:
+                self._by_id, self._by_type = self._load()
+                self._version = version
+            self._checked_at = now
+            return self._by_id, self._by_type
+
+    def get(self, item_id):
+        by_id, _ = self._fresh()
+        try:
+            row = by_id.get(int(item_id))
+        except (TypeError, ValueError):
+            return None
+        return dict(row) if row else None
+
+    def for_db_type(self, db_type):
+        _, by_type = self._fresh()
+        return list(by_type.get((db_type or "").lower(), ()))
+
+    def all(self):
+        by_id, _ = self._fresh()
+        return list(by_id.values())
+
+    def invalidate(self):
+        """Sadece bu process'in kopyasını düşürür."""
+        with self._lock:
+            self._by_id = None
+            self._by_type = {}
+
+    def bump(self):
+        """Tablo yazıldı: tüm worker'lar bir sonraki okumada yeniden yüklesin."""
+        bump_cache_version(self.name)
+        self.invalidate()
@@ -1,6 +1,3 @@
-from flask import Blueprint
-
-# template_folder vermiyoruz; app zaten /templates'i biliyor
-checkpoints_bp = Blueprint('checkpoints', __name__)
-
-from . import routes
\ No newline at end of file
+# Blueprint checkpoints.routes içinde; app.py oradan import eder.
+# Paket import'u Flask / route'ları yüklemez: scan_cli worker'ları yalnızca
+# engine / fleet modüllerini import eder.
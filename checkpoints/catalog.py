@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Process içi checkpoint kataloğu.
+
+Checkpoint tanımları nadiren değişir; run-test / run-detail / scan her
+seferinde repo'ya gitmek yerine buradan okur. new / edit / delete
+catalog.bump() ile diğer worker'ları da geçersiz kılar (bkz. cache.VersionedCatalog).
+"""
+from cache import VersionedCatalog
+from config import CATALOG_CHECK_INTERVAL
+
+
+CATALOG_SQL = """
+    SELECT
+        Id AS id, Name AS name, DB_Type AS db_type, Severity AS severity,
+        Description AS description,
+        Pre_SQL_Test AS pre_sql_test,
+        SQL_Test AS sql_test,
+        Test_Condition AS test_condition,
+        Pre_SQL_Detail AS pre_sql_detail,
+        SQL_Detail AS sql_detail,
+        Text_Pass AS text_pass,
+        Text_Fail AS text_fail,
+        Notes AS notes
+    FROM checkpoints
+    ORDER BY Name, Id
+"""
+
+catalog = VersionedCatalog("checkpoints", CATALOG_SQL, CATALOG_CHECK_INTERVAL)
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Test_Condition derleyicisi.
+
+Condition metni bir kez parse edilip doğrulanır ve tekrar kullanılabilir bir
+predicate'e çevrilir; eval yok. Desteklenen yazımlar (değer solda kabul edilir):
+
+    > 0            == 'OPEN'         != 0
+    in ('A', 'B')  not in (1, 2)     is None / is not None
+    in 'ABC'       (değer metnin alt dizgesi mi; eski eval davranışı)
+    between 1 and 10                 not between 1 and 10
+    >= 1 and <= 5                    == 'A' or == 'B'
+
+Karşılaştırmalar tip duyarlıdır: Decimal sayıya, LOB metne çevrilir; sayı ile
+sayısal metin, tarih ile ISO formatlı metin karşılaştırılabilir.
+"""
+import ast
+import datetime
+import decimal
+import io
+import operator
+import re
+import tokenize
+from functools import lru_cache
+
+
+class ConditionError(ValueError):
+    """Condition metni derlenemedi."""
+
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+_VALUE = "__value__"
+
+# and / or yalnızca operatörle başlayan bir sonraki ifadeye bağlanır
+_CLAUSE_START_OPS = {"==", "!=", "<=", ">=", "<", ">"}
+_CLAUSE_START_NAMES = {"in", "not", "is", "between"}
+_SKIP_TOKENS = {tokenize.NEWLINE, tokenize.NL, tokenize.INDENT, tokenize.DEDENT,
+                tokenize.COMMENT, tokenize.ENDMARKER}
+_BETWEEN = re.compile(r"^(not\s+)?between\s+(.+?)\s+and\s+(.+)$", re.IGNORECASE | re.DOTALL)
+
+
+# ---------- value coercion ---------- #
+
+def _normalize(value):
+    """Driver'dan gelen değeri karşılaştırılabilir Python tipine indirger."""
+    if hasattr(value, "read") and callable(value.read):     # Oracle LOB
+        value = value.read()
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", errors="replace")
+    return value
+
+
+def _to_number(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return float(text)
+
+
+def _coerce_pair(value, literal):
+    """value ile literal'ı aynı tipe getirmeye çalışır; olmazsa olduğu gibi döner."""
+    if value is None or literal is None or isinstance(literal, bool) or isinstance(value, bool):
+        return value, literal
+
+    if isinstance(literal, (int, float)) and isinstance(value, str):
+        try:
+            return _to_number(value.strip()), literal
+        except ValueError:
+            return value, literal
+
+    if isinstance(value, (int, float)) and isinstance(literal, str):
+        try:
+            return value, _to_number(literal.strip())
+        except ValueError:
+            return value, literal
+
+    if isinstance(value, (datetime.date, datetime.datetime)) and isinstance(literal, str):
+        try:
+            if isinstance(value, datetime.datetime):
+                return value, datetime.datetime.fromisoformat(literal.strip())
+            return value, datetime.date.fromisoformat(literal.strip())
+        except ValueError:
+            return value, literal
+
+    return value, literal
+
+
+def _compare(op, value, literal):
+    value, literal = _coerce_pair(value, literal)
+    return op(value, literal)
+
+
+def _contains(value, items):
+    return any(_compare(operator.eq, value, item) for item in items)
+
+
+def _substring(value, text):
+    """`in 'ABC'`: Python'daki gibi alt dizge testi; metin olmayan değer hatadır."""
+    if not isinstance(value, str):
+        raise TypeError(f"'in <string>' requires a string value, not {type(value).__name__}")
+    return value in text
+
+
+# ---------- parsing ---------- #
+
+def _literal(node, text):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        raise ConditionError(f"only literal values are allowed: {text!r}")
+
+
+def _parse_literal_text(text):
+    try:
+        return ast.literal_eval(text.strip())
+    except (ValueError, SyntaxError):
+        raise ConditionError(f"invalid literal: {text.strip()!r}")
+
+
+def _tokens(text):
+    try:
+        return [t for t in tokenize.generate_tokens(io.StringIO(text).readline)
+                if t.type not in _SKIP_TOKENS]
+    except (tokenize.TokenError, IndentationError):
+        raise ConditionError(f"cannot parse condition: {text!r}")
+
+
+def _starts_clause(token):
+    if token.type == tokenize.OP:
+        return token.string in _CLAUSE_START_OPS
+    return token.type == tokenize.NAME and token.string.lower() in _CLAUSE_START_NAMES
+
+
+def _split_clauses(text):
+    """
+    Metni OR gruplarına, grupları AND ile bağlı ifadelere böler (token bazında;
+    literal ve parantez içindeki and / or bölmez). `between X and Y`'deki and
+    BETWEEN'e aittir.
+    """
+    lines = text.splitlines(keepends=True)
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line))
+
+    def offset(pos):
+        return line_starts[pos[0] - 1] + pos[1]
+
+    groups, clauses = [], []
+    start = depth = 0
+    in_between = False
+    tokens = _tokens(text)
+    for i, tok in enumerate(tokens):
+        if tok.type == tokenize.OP and tok.string in "([{":
+            depth += 1
+        elif tok.type == tokenize.OP and tok.string in ")]}":
+            depth -= 1
+        elif depth == 0 and tok.type == tokenize.NAME:
+            word = tok.string.lower()
+            if word == "between":
+                in_between = True
+            elif word == "and" and in_between:
+                in_between = False
+            elif (word in ("and", "or") and i + 1 < len(tokens)
+                    and _starts_clause(tokens[i + 1])):
+                clauses.append(text[start:offset(tok.start)])
+                start = offset(tok.end)
+                if word == "or":
+                    groups.append(clauses)
+                    clauses = []
+    clauses.append(text[start:])
+    groups.append(clauses)
+    return groups
+
+
+def _compile_clause(text):
+    """Tek bir 'op literal' ifadesini predicate'e çevirir."""
+    clause = text.strip()
+    if not clause:
+        raise ConditionError("empty condition")
+
+    m = _BETWEEN.match(clause)
+    if m:
+        negate = bool(m.group(1))
+        low = _parse_literal_text(m.group(2))
+        high = _parse_literal_text(m.group(3))
+
+        def between(v):
+            inside = _compare(operator.ge, v, low) and _compare(operator.le, v, high)
+            return not inside if negate else inside
+        return between
+
+    try:
+        tree = ast.parse(f"{_VALUE} {clause}", mode="eval")
+    except SyntaxError:
+        raise ConditionError(f"cannot parse condition: {clause!r}")
+
+    node = tree.body
+    if (not isinstance(node, ast.Compare) or len(node.ops) != 1
+            or not isinstance(node.left, ast.Name) or node.left.id != _VALUE):
+        raise ConditionError(f"condition must be a single comparison: {clause!r}")
+
+    op = node.ops[0]
+    literal = _literal(node.comparators[0], clause)
+
+    if isinstance(op, (ast.In, ast.NotIn)):
+        if isinstance(literal, str):
+            contains = lambda v: _substring(v, literal)
+        elif isinstance(literal, (tuple, list, set, frozenset)):
+            items = list(literal)
+            contains = lambda v: _contains(v, items)
+        else:
+            raise ConditionError(f"IN needs a list of values or a string: {clause!r}")
+        if isinstance(op, ast.In):
+            return contains
+        return lambda v: not contains(v)
+
+    if isinstance(op, (ast.Is, ast.IsNot)):
+        # 1 == True olduğu için kimlikle bakılır
+        if not any(literal is x for x in (None, True, False)):
+            raise ConditionError(f"'is' may only be used with None/True/False: {clause!r}")
+        if isinstance(op, ast.Is):
+            return lambda v: v is literal
+        return lambda v: v is not literal
+
+    fn = _COMPARE_OPS.get(type(op))
+    if fn is None:
+        raise ConditionError(f"unsupported operator in {clause!r}")
+    return lambda v: _compare(fn, v, literal)
+
+
+class Predicate:
+    """Derlenmiş Test_Condition."""
+
+    __slots__ = ("text", "_groups")
+
+    def __init__(self, text, groups):
+        self.text = text
+        self._groups = groups      # OR of AND-groups
+
+    def __call__(self, value):
+        value = _normalize(value)
+        return any(all(p(value) for p in group) for group in self._groups)
+
+    def describe(self, value):
+        return f"{_normalize(value)!r} {self.text}"
+
+
+@lru_cache(maxsize=4096)
+def compile_condition(text):
+    """
+    Condition metnini Predicate'e derler (metne göre cache'lenir).
+    Geçersiz yazımda ConditionError.
+    """
+    text = (text or "").strip()
+    if not text:
+        raise ConditionError("empty condition")
+
+    groups = [[_compile_clause(part) for part in clauses] for clauses in _split_clauses(text)]
+    return Predicate(text, groups)
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+SQL Detail sonuçlarını belleğe almadan işlemek için yardımcılar.
+"""
+import csv
+import datetime
+import decimal
+import io
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config import (
+    DETAIL_FETCH_BATCH,
+    DETAIL_PAGE_SIZE,
+    DETAIL_MAX_ROWS,
+    DETAIL_CURSOR_TTL,
+    DETAIL_CURSOR_MAX,
+    DETAIL_CURSOR_MAX_PER_DS,
+    DETAIL_TIMEOUT_SECONDS,
+)
+from metrics import timed
+from .engine import run_pre_sql, metric_labels, set_call_timeout, cancel_fn, is_timeout_error
+from .watchdog import watchdog
+from .pool import target_pool, ds_key
+from .store import record_detail_stat
+
+
+def cell(value):
+    """Detail hücresini metin/JSON'a yazılabilir hale getirir."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "read") and callable(value.read):     # Oracle LOB
+        value = value.read()
+        if isinstance(value, str):
+            return value
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return str(value)
+
+
+def _detail_error(phase, exc, guard, timeout):
+    if guard.fired or is_timeout_error(exc):
+        after = f" after {timeout:g}s" if timeout else ""
+        return RuntimeError(f"{phase} timed out{after}: {exc}")
+    return RuntimeError(f"{phase} error: {exc}")
+
+
+def open_detail_cursor(conn, checkpoint, batch=DETAIL_FETCH_BATCH, ds=None,
+                       timeout=DETAIL_TIMEOUT_SECONDS):
+    """
+    Pre_SQL_Detail + SQL_Detail'i çalıştırır ve açık cursor'ı kolon adlarıyla
+    döner. Hata mesajları run_checkpoint_detail ile aynı formattadır.
+    Sürücü timeout'u (Oracle'da sonraki fetch'ler dahil) `timeout` saniyeye
+    ayarlanır. ds yalnızca metrics etiketleri için kullanılır.
+    """
+    labels = metric_labels(checkpoint, ds)
+    cur = conn.cursor()
+    try:
+        cur.arraysize = batch
+    except Exception:
+        pass
+    set_call_timeout(conn, timeout)
+
+    with watchdog.watch(timeout, cancel_fn(conn, cur)) as guard:
+        pre_sql = checkpoint.get("pre_sql_detail")
+        if pre_sql:
+            try:
+                with timed("pre_sql_detail", **labels):
+                    run_pre_sql(conn, cur, pre_sql, checkpoint.get("db_type"))
+            except Exception as e:
+                cur.close()
+                raise _detail_error("Pre SQL Detail", e, guard, timeout)
+
+        try:
+            with timed("sql_detail", **labels):
+                cur.execute(checkpoint["sql_detail"])
+        except Exception as e:
+            cur.close()
+            raise _detail_error("SQL Detail", e, guard, timeout)
+
+    cols = [desc[0] for desc in cur.description] if cur.description else []
+    return cur, cols
+
+
+def iter_batches(cur, batch=DETAIL_FETCH_BATCH):
+    while True:
+        rows = cur.fetchmany(batch)
+        if not rows:
+            return
+        yield rows
+
+
+def stream_csv(cur, cols, batch=DETAIL_FETCH_BATCH):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(cols)
+    yield buf.getvalue()
+
+    for rows in iter_batches(cur, batch):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows([cell(v) for v in r] for r in rows)
+        yield buf.getvalue()
+
+
+def stream_ndjson(cur, cols, batch=DETAIL_FETCH_BATCH):
+    for rows in iter_batches(cur, batch):
+        yield "".join(
+            json.dumps(dict(zip(cols, (cell(v) for v in r))), ensure_ascii=False) + "\n"
+            for r in rows
+        )
+
+
+class CountingCursor:
+    """fetchmany ile okunan satırları sayan ince cursor sarmalayıcı (export istatistiği için)."""
+
+    def __init__(self, cur):
+        self._cur = cur
+        self.row_count = 0
+
+    def fetchmany(self, size):
+        rows = self._cur.fetchmany(size)
+        self.row_count += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", stream_csv),
+    "ndjson": ("application/x-ndjson", stream_ndjson),
+}
+
+
+# ---------- Paged viewer ---------- #
+
+class _DetailEntry:
+    def __init__(self, ds, conn, cur, cols, owner, checkpoint_id=None, busy=0.0):
+        self.ds = ds
+        self.conn = conn
+        self.cur = cur
+        self.cols = cols
+        self.owner = owner
+        self.checkpoint_id = checkpoint_id
+        self.busy = busy            # execute + fetch süresi (sn); kullanıcının bekleme süresi hariç
+        self.rows = []              # şimdiye kadar okunan (cell'e çevrilmiş) satırlar
+        self.exhausted = False
+        self.truncated = False
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    @property
+    def live(self):
+        """Cursor hâlâ açık (havuzdan bir bağlantı tutuyor)."""
+        return self.cur is not None
+
+    def finish(self, discard=False):
+        """Cursor'ı kapatır, bağlantıyı havuza iade eder; okunan satırlar kalır."""
+        if self.cur is None:
+            return
+        try:
+            self.cur.close()
+        except Exception:
+            pass
+        target_pool.release(self.ds, self.conn, discard=discard)
+        self.cur = self.conn = None
+        if self.checkpoint_id is not None:
+            record_detail_stat(
+                self.checkpoint_id, self.ds.get("id"), self.busy * 1000,
+                len(self.rows), complete=self.exhausted,
+            )
+
+
+def _drop(entries):
+    for e in entries:
+        with e.lock:
+            e.finish(discard=True)
+
+
+class DetailCursorCache:
+    """
+    Detail sonucunu sayfa sayfa okumak için açık cursor'ları tutar.
+
+    İlk sayfa hemen döner; sonraki sayfalar istendikçe aynı cursor'dan
+    fetchmany ile okunur ve bellekte biriktirilir (geri sayfalar buradan
+    gelir). max_rows'a ulaşınca ya da sonuç bitince cursor kapatılıp
+    bağlantı havuza iade edilir. ttl boyunca erişilmeyen girişleri arka
+    plandaki reaper kapatır. Bir datasource'ta en fazla max_per_ds cursor
+    açık kalır; yenisi açılınca en eski viewer kapanır ki açık viewer'lar
+    o datasource'un havuzunu tüketmesin.
+    """
+
+    def __init__(self, page_size=DETAIL_PAGE_SIZE, max_rows=DETAIL_MAX_ROWS,
+                 ttl=DETAIL_CURSOR_TTL, max_entries=DETAIL_CURSOR_MAX,
+                 max_per_ds=DETAIL_CURSOR_MAX_PER_DS):
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_per_ds = max_per_ds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def open(self, ds, conn, cur, cols, owner=None, checkpoint_id=None, exec_seconds=0.0):
+        """
+        Açık cursor'ı cache'e alır ve token döner. conn artık cache'e aittir.
+        checkpoint_id verilirse cursor kapanınca süre / satır sayısı detail_stats'a yazılır.
+        """
+        token = uuid.uuid4().hex
+        entry = _DetailEntry(ds, conn, cur, cols, owner, checkpoint_id, exec_seconds)
+        with self._lock:
+            self._entries[token] = entry
+            evicted = self._evict_locked(ds, self.max_per_ds)
+        _drop(evicted)
+        self._start_reaper()
+        return token
+
+    def make_room(self, ds):
+        """
+        Bağlantı almadan önce çağrılır: datasource'taki açık cursor sayısını
+        max_per_ds - 1'e indirir (en eski viewer'lar kapanır).
+        """
+        with self._lock:
+            evicted = self._evict_locked(ds, self.max_per_ds - 1)
+        _drop(evicted)
+
+    def _evict_locked(self, ds=None, keep_live=None):
+        cutoff = time.monotonic() - self.ttl
+        evicted = []
+        for token in [t for t, e in self._entries.items() if e.last_used < cutoff]:
+            evicted.append(self._entries.pop(token))
+        while len(self._entries) > self.max_entries:
+            evicted.append(self._entries.popitem(last=False)[1])
+        if ds is not None:
+            # _entries LRU sırasında: baştakiler en uzun süredir kullanılmayanlar
+            key = ds_key(ds)
+            live = [t for t, e in self._entries.items() if e.live and ds_key(e.ds) == key]
+            for token in live[:max(0, len(live) - max(0, keep_live))]:
+                evicted.append(self._entries.pop(token))
+        return evicted
+
+    def reap(self):
+        """Süresi dolan girişleri kapatır (reaper thread'i çağırır)."""
+        with self._lock:
+            evicted = self._evict_locked()
+        _drop(evicted)
+
+    def _start_reaper(self):
+        if self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is None:
+                t = threading.Thread(target=self._reaper_loop, name="detail-cursor-reaper", daemon=True)
+                self._reaper = t
+                t.start()
+
+    def _reaper_loop(self):
+        while True:
+            time.sleep(max(5, self.ttl / 10))
+            self.reap()
+
+    def page(self, token, page_no, owner=None):
+        """
+        page_no (0'dan başlar) sayfasını döner; token yoksa / süresi dolmuşsa None.
+        """
+        with self._lock:
+            evicted = self._evict_locked()
+            entry = self._entries.get(token)
+            if entry is not None:
+                self._entries.move_to_end(token)
+        _drop(evicted)
+        if entry is None or (owner is not None and entry.owner != owner):
+            return None
+
+        page_no = max(0, int(page_no))
+        start = page_no * self.page_size
+        end = start + self.page_size
+
+        with entry.lock:
+            entry.last_used = time.monotonic()
+            while len(entry.rows) < end and not (entry.exhausted or entry.truncated):
+                if not entry.live:
+                    # Sayfa okunurken başka bir istek cursor'ı kapatmış (eviction)
+                    break
+                want = min(self.page_size, self.max_rows - len(entry.rows))
+                fetch_started = time.monotonic()
+                try:
+                    rows = entry.cur.fetchmany(want)
+                    entry.rows.extend([cell(v) for v in r] for r in rows)
+                    if len(rows) < want:
+                        entry.exhausted = True
+                    elif len(entry.rows) >= self.max_rows:
+                        # Limitte bir satır daha var mı? Yoksa truncated demeyelim
+                        entry.truncated = bool(entry.cur.fetchmany(1))
+                        entry.exhausted = not entry.truncated
+                except Exception:
+                    entry.exhausted = True
+                    entry.finish(discard=True)
+                    raise
+                finally:
+                    entry.busy += time.monotonic() - fetch_started
+                if entry.exhausted or entry.truncated:
+                    entry.finish()
+
+            return {
+                "columns": entry.cols,
+                "rows": entry.rows[start:end],
+                "page": page_no,
+                "page_size": self.page_size,
+                "row_count": len(entry.rows),
+                "has_more": len(entry.rows) > end or not (entry.exhausted or entry.truncated),
+                "truncated": entry.truncated,
+                "max_rows": self.max_rows,
+            }
+
+    def close(self, token):
+        with self._lock:
+            entry = self._entries.pop(token, None)
+        if entry is not None:
+            with entry.lock:
+                entry.finish()
+
+
+detail_cache = DetailCursorCache()
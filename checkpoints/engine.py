@@ -0,0 +1,572 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoint execution engine.
+
+Flask'a bağımlı değildir; hem route'lar hem de toplu taramalar buradaki
+fonksiyonları kullanır.
+"""
+import hashlib
+import math
+import re
+import time
+
+from config import (
+    SCAN_BATCH_SIZE,
+    CONNECT_TIMEOUT_SECONDS,
+    CHECK_TIMEOUT_SECONDS,
+)
+from metrics import timed, observe_phase
+from .conditions import compile_condition, ConditionError
+from .pool import target_pool
+from .sqlscript import run_script
+from .watchdog import watchdog
+
+SUPPORTED_DB_TYPES = ("oracle", "mssql")
+
+
+# ---------- Connections ---------- #
+
+def get_oracle_connection(ds):
+    """
+    Oracle connection – datasources iş mantığıyla uyumlu.
+    """
+    try:
+        import oracledb
+    except ImportError:
+        raise RuntimeError("python-oracledb module is not installed. Please install it in the virtualenv.")
+
+    host = ds.get("host")
+    port = int(ds.get("port") or 1521)
+    user = ds.get("username")
+    pwd = ds.get("password")
+    service_name = ds.get("oracle_service_name")
+    sid = ds.get("oracle_sid")
+
+    if service_name:
+        dsn = oracledb.makedsn(host=host, port=port, service_name=service_name)
+    elif sid:
+        dsn = oracledb.makedsn(host=host, port=port, sid=sid)
+    else:
+        raise RuntimeError("Oracle requires service_name or SID.")
+
+    kwargs = {}
+    if CONNECT_TIMEOUT_SECONDS:
+        kwargs["tcp_connect_timeout"] = CONNECT_TIMEOUT_SECONDS
+    with timed("connect", db_type="oracle", datasource=ds.get("name")):
+        conn = oracledb.connect(user=user, password=pwd, dsn=dsn, **kwargs)
+    return conn
+
+
+def get_mssql_connection(ds):
+    """
+    MSSQL connection – pyodbc + ODBC Driver 18 ile.
+    """
+    try:
+        import pyodbc
+    except ImportError:
+        raise RuntimeError("pyodbc module is not installed. Please install it in the virtualenv.")
+
+    host = ds.get("host")
+    port = int(ds.get("port") or 1433)
+    auth_mode = ds.get("auth_mode") or "sql"
+    username = ds.get("username")
+    password = ds.get("password")
+
+    # DB alanını düzgün normalize edelim
+    database_raw = ds.get("database_name")
+    database = (database_raw or "").strip()
+    if database.lower() == "none":
+        database = ""
+
+    driver = "{ODBC Driver 18 for SQL Server}"
+
+    if auth_mode == "sql":
+        db_part = f"DATABASE={database};" if database else ""
+        conn_str = (
+            f"DRIVER={driver};"
+            f"SERVER={host},{port};"
+            f"{db_part}"
+            f"UID={username};PWD={password};"
+            "Encrypt=no;"
+            "TrustServerCertificate=yes;"
+        )
+    else:
+        db_part = f"DATABASE={database};" if database else ""
+        conn_str = (
+            f"DRIVER={driver};"
+            f"SERVER={host},{port};"
+            f"{db_part}"
+            "Trusted_Connection=yes;"
+            "Encrypt=no;"
+            "TrustServerCertificate=yes;"
+        )
+
+    kwargs = {}
+    if CONNECT_TIMEOUT_SECONDS:
+        kwargs["timeout"] = CONNECT_TIMEOUT_SECONDS       # login timeout
+    with timed("connect", db_type="mssql", datasource=ds.get("name")):
+        return pyodbc.connect(conn_str, **kwargs)
+
+
+def open_connection(ds, db_type=None):
+    """
+    Datasource tipine göre uygun bağlantıyı açar.
+    """
+    db_type = (db_type or ds.get("db_type") or "").lower()
+    if db_type == "oracle":
+        return get_oracle_connection(ds)
+    if db_type == "mssql":
+        return get_mssql_connection(ds)
+    raise RuntimeError("Unsupported DB")
+
+
+# ---------- Timeouts ---------- #
+
+# Oracle: DPI-1067 call timeout, ORA-01013 cancel; ODBC: HYT00 / HYT01 timeout
+_TIMEOUT_MARKERS = ("dpi-1067", "ora-01013", "hyt00", "hyt01", "timeout expired", "call timeout")
+
+
+def is_timeout_error(exc):
+    text = str(exc).lower()
+    return any(m in text for m in _TIMEOUT_MARKERS)
+
+
+def set_call_timeout(conn, seconds):
+    """
+    Sürücünün kendi sorgu zaman aşımını ayarlar: oracledb call_timeout (ms),
+    pyodbc timeout (sn). seconds None / 0 ise sınırı kaldırır.
+    """
+    try:
+        if hasattr(conn, "call_timeout"):
+            conn.call_timeout = int(seconds * 1000) if seconds else 0
+        elif hasattr(conn, "timeout"):
+            conn.timeout = max(1, math.ceil(seconds)) if seconds else 0
+    except Exception:
+        pass
+
+
+def cancel_fn(conn, cur):
+    """Watchdog'un çağıracağı iptal: pyodbc cursor.cancel, oracledb connection.cancel."""
+    if hasattr(cur, "cancel"):
+        return cur.cancel
+    if hasattr(conn, "cancel"):
+        return conn.cancel
+    return None
+
+
+def check_budget(deadline=None, timeout=None):
+    """
+    Bir sonraki checkpoint'e kalan süre: CHECK_TIMEOUT_SECONDS ile scan
+    deadline'ından (monotonic) kalanın küçüğü. Sınır yoksa None, süre
+    bittiyse <= 0.
+    """
+    if timeout is None:
+        timeout = CHECK_TIMEOUT_SECONDS or None
+    if deadline is None:
+        return timeout
+    left = deadline - time.monotonic()
+    return left if timeout is None else min(timeout, left)
+
+
+# ---------- Condition ---------- #
+
+def evaluate_condition(result_value, condition_text):
+    """
+    result_value: SQL_Test'ten dönen ilk kolon (int/float/str/Decimal/date/LOB/None)
+    condition_text: ör. '> 0', '== 0', "== 'OPEN'", "in ('A','B')", 'between 1 and 5'
+
+    Condition bir kez derlenip cache'lenir (bkz. conditions.py).
+    """
+    if not condition_text:
+        return None, None
+
+    try:
+        predicate = compile_condition(condition_text)
+    except ConditionError as e:
+        return None, f"Condition syntax error: {e}"
+
+    try:
+        value = bool(predicate(result_value))
+    except Exception as e:
+        return None, f"Condition evaluation error: {e} (expr={result_value!r} {condition_text})"
+
+    return (value, predicate.describe(result_value)), None
+
+
+# ---------- Execution ---------- #
+
+def fingerprint(checkpoint):
+    """
+    Checkpoint'in sonucunu belirleyen alanların özeti
+    (Pre_SQL_Test, SQL_Test, Test_Condition). Incremental scan bunu kullanır.
+    """
+    h = hashlib.sha256()
+    for field in ("pre_sql_test", "sql_test", "test_condition"):
+        h.update((checkpoint.get(field) or "").strip().encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def run_pre_sql(conn, cur, pre_sql, db_type=None):
+    """
+    Pre SQL script'ini db_type lehçesinde çalıştırır ve commit eder: Oracle'da
+    ifade başına, MSSQL'de GO batch'i başına bir execute (bkz. sqlscript.py).
+    Session ayarları değişebileceği için bağlantı havuza geri konmaz.
+    """
+    target_pool.taint(conn)
+    run_script(conn, cur, pre_sql, db_type)
+
+
+def _result(checkpoint, status, result_value=None, condition_expr=None, error=None):
+    return {
+        "checkpoint_id": checkpoint.get("id"),
+        "name": checkpoint.get("name"),
+        "severity": checkpoint.get("severity"),
+        "status": status,
+        "result_value": result_value,
+        "condition_expr": condition_expr,
+        "error": error,
+        "duration_ms": None,
+        "fingerprint": fingerprint(checkpoint),
+    }
+
+
+def metric_labels(checkpoint, ds):
+    """metrics etiketleri: db_type, checkpoint, datasource."""
+    return {
+        "db_type": (checkpoint.get("db_type") or "").lower(),
+        "checkpoint": checkpoint.get("name"),
+        "datasource": (ds or {}).get("name"),
+    }
+
+
+DEADLINE_ERROR = "Scan deadline exceeded; checkpoint was not run."
+
+
+def deadline_result(checkpoint):
+    return _result(checkpoint, "TIMEOUT", error=DEADLINE_ERROR)
+
+
+def run_test(conn, checkpoint, ds=None, timeout=None):
+    """
+    Tek bir checkpoint'i açık bir bağlantı üzerinde çalıştırır:
+    Pre_SQL_Test -> SQL_Test -> Test_Condition.
+
+    Dönen dict: status (PASS / FAIL / NO_CONDITION / ERROR / TIMEOUT),
+    result_value, condition_expr, error, duration_ms. Bağlantıyı kapatmaz;
+    TIMEOUT sonrası bağlantı güvenilir değildir, çağıran havuza geri koymamalı.
+    timeout verilmezse CHECK_TIMEOUT_SECONDS. ds yalnızca metrics etiketleri
+    için kullanılır.
+    """
+    if timeout is None:
+        timeout = check_budget()
+    started = time.monotonic()
+    res = _run_test(conn, checkpoint, ds, timeout)
+    res["duration_ms"] = round((time.monotonic() - started) * 1000, 2)
+    return res
+
+
+def _failed(checkpoint, phase, exc, guard, timeout):
+    if guard.fired or is_timeout_error(exc):
+        # timeout None: sınırsız; zaman aşımı sürücünün kendi timeout'undan gelmiştir
+        limit = f"exceeded {timeout:g}s timeout" if timeout else "timed out"
+        return _result(checkpoint, "TIMEOUT", error=f"{phase} {limit}: {exc}")
+    return _result(checkpoint, "ERROR", error=f"{phase} error: {exc}")
+
+
+def _run_test(conn, checkpoint, ds=None, timeout=None):
+    try:
+        cur = conn.cursor()
+    except Exception as e:
+        return _result(checkpoint, "ERROR", error=str(e))
+
+    set_call_timeout(conn, timeout)
+    try:
+        with watchdog.watch(timeout, cancel_fn(conn, cur)) as guard:
+            # ----------- PRE SQL -------------
+            pre_sql = checkpoint.get("pre_sql_test")
+            if pre_sql:
+                try:
+                    with timed("pre_sql", **metric_labels(checkpoint, ds)):
+                        run_pre_sql(conn, cur, pre_sql, checkpoint.get("db_type"))
+                except Exception as e:
+                    return _failed(checkpoint, "Pre SQL Test", e, guard, timeout)
+
+            # ----------- SQL TEST -------------
+            try:
+                with timed("sql_test", **metric_labels(checkpoint, ds)):
+                    cur.execute(checkpoint.get("sql_test"))
+                    row = cur.fetchone()
+            except Exception as e:
+                return _failed(checkpoint, "SQL Test", e, guard, timeout)
+    finally:
+        try:
+            cur.close()
+        except Exception:
+            pass
+
+    if not row:
+        return _result(checkpoint, "ERROR", error="SQL Test returned no rows.")
+
+    return _evaluate(checkpoint, row[0], ds)
+
+
+def _evaluate(checkpoint, result_value, ds=None):
+    with timed("evaluate", **metric_labels(checkpoint, ds)):
+        eval_result, eval_error = evaluate_condition(result_value, checkpoint.get("test_condition"))
+    if eval_error:
+        return _result(checkpoint, "ERROR", result_value=result_value, error=eval_error)
+    if eval_result is None:
+        return _result(checkpoint, "NO_CONDITION", result_value=result_value)
+
+    ok, condition_expr = eval_result
+    return _result(
+        checkpoint,
+        "PASS" if ok else "FAIL",
+        result_value=result_value,
+        condition_expr=condition_expr,
+    )
+
+
+# ---------- Batched execution ---------- #
+
+_SELECT_START = re.compile(r"^\s*select\b", re.IGNORECASE)
+_WITH_START = re.compile(r"^\s*with\b", re.IGNORECASE)
+
+
+def _batch_sql(checkpoint):
+    """
+    Skaler alt sorgu olarak birleştirilebilecek SQL_Test metni; uygun değilse None.
+    Pre SQL'i olan, birden fazla ifade içeren ya da SELECT ile başlamayan
+    sorgular tek başına çalışır. MSSQL alt sorguda WITH kabul etmez.
+    """
+    if (checkpoint.get("pre_sql_test") or "").strip():
+        return None
+    sql = (checkpoint.get("sql_test") or "").strip().rstrip(";").strip()
+    if not sql or ";" in sql:
+        return None
+    db_type = (checkpoint.get("db_type") or "").lower()
+    if _SELECT_START.match(sql) or (db_type == "oracle" and _WITH_START.match(sql)):
+        return sql
+    return None
+
+
+def _combined_sql(db_type, sqls):
+    cols = ",\n".join(f"({sql}) AS c{i}" for i, sql in enumerate(sqls))
+    if db_type == "oracle":
+        return f"SELECT\n{cols}\nFROM dual"
+    return f"SELECT\n{cols}"
+
+
+class ConnectionLease:
+    """
+    Taramanın havuzdan aldığı bağlantı. Zaman aşımıyla iptal edilen bir
+    çağrıdan ya da Pre SQL'den sonra session'a güvenilmez; renew() onu atıp
+    yenisini alır.
+    Yeni bağlantı alınamazsa conn None olur, sebebi error'da kalır.
+    """
+
+    def __init__(self, ds, conn):
+        self.ds = ds
+        self.conn = conn
+        self.error = None
+
+    def renew(self):
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            target_pool.release(self.ds, conn, discard=True)
+        try:
+            self.conn = target_pool.acquire(self.ds)
+        except Exception as e:
+            self.error = str(e)
+
+    def release(self):
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            target_pool.release(self.ds, conn)
+
+
+def _connection_error(checkpoint, lease):
+    return _result(checkpoint, "ERROR", error=f"Connection error: {lease.error}")
+
+
+def _run_single(lease, checkpoint, deadline=None, timeout=None):
+    """Tek checkpoint; TIMEOUT ya da Pre SQL sonrası lease yeni bağlantıya geçer."""
+    if timeout is None:
+        timeout = check_budget(deadline)
+    if timeout is not None and timeout <= 0:
+        return deadline_result(checkpoint)
+    if lease.conn is None:
+        return _connection_error(checkpoint, lease)
+    res = run_test(lease.conn, checkpoint, lease.ds, timeout)
+    if res["status"] == "TIMEOUT" or (checkpoint.get("pre_sql_test") or "").strip():
+        # Pre SQL'in session ayarları sonraki checkpoint'lere taşınmasın
+        lease.renew()
+    return res
+
+
+def run_batch(lease, checkpoints, db_type, timeout=None, deadline=None):
+    """
+    Skaler checkpoint'leri tek SELECT (tek round trip) ile çalıştırır.
+
+    Birleşik sorgu hata verirse grup ikiye bölünüp yeniden denenir; tek
+    kalan checkpoint run_test ile kendi başına çalışır ve gerçek hatasını
+    döner. NULL dönen değerler (alt sorgu satır döndürmemiş olabilir) de
+    tekil çalıştırmayla doğrulanır. Birleşik sorgu zaman aşımına uğrarsa
+    iptal edilen bağlantı atılır ve checkpoint'ler yeni bağlantıda tek tek
+    (her biri deadline'dan kalan süreyle) çalışır; böylece yavaş olan tek
+    seferde ayıklanır.
+    """
+    if timeout is None:
+        timeout = check_budget(deadline)
+    if timeout is not None and timeout <= 0:
+        return [deadline_result(c) for c in checkpoints]
+    if lease.conn is None:
+        return [_connection_error(c, lease) for c in checkpoints]
+    if len(checkpoints) == 1:
+        return [_run_single(lease, checkpoints[0], timeout=timeout)]
+
+    conn = lease.conn
+    ds = lease.ds
+    started = time.monotonic()
+    guard = None
+    try:
+        cur = conn.cursor()
+        set_call_timeout(conn, timeout)
+        try:
+            with watchdog.watch(timeout, cancel_fn(conn, cur)) as guard:
+                cur.execute(_combined_sql(db_type, [_batch_sql(c) for c in checkpoints]))
+                row = cur.fetchone()
+        finally:
+            try:
+                cur.close()
+            except Exception:
+                pass
+        if not row:
+            raise RuntimeError("batch returned no row")
+    except Exception as e:
+        if (guard is not None and guard.fired) or is_timeout_error(e):
+            lease.renew()
+            return [_run_single(lease, c, deadline) for c in checkpoints]
+        mid = len(checkpoints) // 2
+        return (run_batch(lease, checkpoints[:mid], db_type, deadline=deadline)
+                + run_batch(lease, checkpoints[mid:], db_type, deadline=deadline))
+
+    elapsed = time.monotonic() - started
+    per_check = round(elapsed * 1000 / len(checkpoints), 2)
+    results = []
+    for checkpoint, value in zip(checkpoints, row):
+        if value is None:
+            results.append(_run_single(lease, checkpoint, deadline))
+            continue
+        # Batch süresi checkpoint'lere eşit paylaştırılır; gerçek tekil süre
+        # değildir, profiler bu örnekleri (batched) sıralamaya katmaz
+        observe_phase("sql_test", elapsed / len(checkpoints), **metric_labels(checkpoint, ds))
+        res = _evaluate(checkpoint, value, ds)
+        res["duration_ms"] = per_check
+        res["batched"] = True
+        results.append(res)
+    return results
+
+
+def iter_results(lease, checkpoints, db_type, batch_size=None, deadline=None):
+    """
+    Checkpoint'leri sırayı koruyarak çalıştırır ve sonuçları yield eder.
+    Art arda gelen skaler checkpoint'ler batch_size'lık gruplarla
+    run_batch'e gider; diğerleri run_test ile tek tek çalışır.
+
+    deadline (time.monotonic) verilirse her çağrının timeout'u kalan süreyle
+    sınırlanır; süre bitince kalan checkpoint'ler çalıştırılmadan TIMEOUT döner.
+    Zaman aşımından sonra lease yeni bağlantıyla devam eder.
+    """
+    if batch_size is None:
+        batch_size = SCAN_BATCH_SIZE
+
+    def run(group):
+        return run_batch(lease, group, db_type, deadline=deadline)
+
+    pending = []
+    for checkpoint in checkpoints:
+        if batch_size and batch_size > 1 and _batch_sql(checkpoint):
+            pending.append(checkpoint)
+            if len(pending) >= batch_size:
+                yield from run(pending)
+                pending = []
+            continue
+        if pending:
+            yield from run(pending)
+            pending = []
+        yield from run([checkpoint])
+    if pending:
+        yield from run(pending)
+
+
+def matching_checkpoints(ds, checkpoints):
+    """Datasource'un db_type'ına uyan checkpoint'ler."""
+    db_type = (ds.get("db_type") or "").lower()
+    return [c for c in checkpoints if (c.get("db_type") or "").lower() == db_type]
+
+
+def summarize(results):
+    """Status -> adet."""
+    summary = {}
+    for r in results:
+        summary[r["status"]] = summary.get(r["status"], 0) + 1
+    return summary
+
+
+def scan_datasource(ds, checkpoints, on_result=None, deadline=None):
+    """
+    Bir datasource için havuzdan TEK bağlantı alır ve verilen tüm
+    checkpoint'leri bu bağlantı üzerinden sırayla çalıştırır; skaler
+    SQL_Test'ler SCAN_BATCH_SIZE'lık gruplarla tek sorguda birleştirilir.
+
+    Bağlantı kurulamazsa kalan her checkpoint ERROR olarak döner. Bir
+    checkpoint TIMEOUT olursa ya da Pre SQL çalıştırırsa bağlantı atılır,
+    yenisiyle devam edilir (bkz. ConnectionLease); her checkpoint en fazla
+    bir kez çalışır.
+    deadline (time.monotonic) geçince kalanlar çalıştırılmadan TIMEOUT olur.
+    on_result(ds, result) verilirse her checkpoint bittiğinde çağrılır.
+    """
+    db_type = (ds.get("db_type") or "").lower()
+    started = time.monotonic()
+    scan = {
+        "ds_id": ds.get("id"),
+        "ds_name": ds.get("name"),
+        "db_type": db_type,
+        "host": ds.get("host"),
+        "error": None,
+        "results": [],
+    }
+
+    def emit(res):
+        scan["results"].append(res)
+        if on_result:
+            on_result(ds, res)
+
+    remaining = matching_checkpoints(ds, checkpoints)
+
+    if remaining and deadline is not None and time.monotonic() >= deadline:
+        for checkpoint in remaining:
+            emit(deadline_result(checkpoint))
+        remaining = []
+
+    if remaining:
+        try:
+            conn = target_pool.acquire(ds)
+        except Exception as e:
+            scan["error"] = str(e)
+            for checkpoint in remaining:
+                emit(_result(checkpoint, "ERROR", error=f"Connection error: {e}"))
+        else:
+            lease = ConnectionLease(ds, conn)
+            try:
+                for res in iter_results(lease, remaining, db_type, deadline=deadline):
+                    emit(res)
+            finally:
+                lease.release()
+            scan["error"] = lease.error
+
+    scan["summary"] = summarize(scan["results"])
+    scan["duration_ms"] = round((time.monotonic() - started) * 1000, 2)
+    return scan
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Fleet scan – checkpoint setini birden fazla datasource'a paralel uygular.
+
+Toplam eşzamanlılık FLEET_MAX_WORKERS ile, aynı host'a giden eşzamanlı
+tarama sayısı ise FLEET_MAX_PER_HOST ile sınırlanır. Limitler process
+genelindedir: aynı anda çalışan fleet job'ları aynı semaphore'ları paylaşır,
+iki job birlikte de bir host'a FLEET_MAX_PER_HOST'tan fazla tarama açamaz.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import FLEET_MAX_WORKERS, FLEET_MAX_PER_HOST, SCAN_DEADLINE_SECONDS
+from .engine import scan_datasource, summarize
+
+
+_SLOT_POLL = 0.2       # slot'lar başka job'larda doluyken yeniden deneme aralığı (sn)
+
+
+def _host_key(ds):
+    return (ds.get("host") or "").strip().lower()
+
+
+class _FleetSlots:
+    """Process genelinde toplam ve host başına tarama slot'ları (bloklamayan)."""
+
+    def __init__(self, max_workers=FLEET_MAX_WORKERS, max_per_host=FLEET_MAX_PER_HOST):
+        self.max_per_host = max(1, int(max_per_host))
+        self._workers = threading.BoundedSemaphore(max(1, int(max_workers)))
+        self._hosts = {}        # host -> BoundedSemaphore
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        with self._lock:
+            sem = self._hosts.get(host)
+            if sem is None:
+                sem = self._hosts[host] = threading.BoundedSemaphore(self.max_per_host)
+            return sem
+
+    def try_acquire(self, host):
+        if not self._workers.acquire(blocking=False):
+            return False
+        if not self._host(host).acquire(blocking=False):
+            self._workers.release()
+            return False
+        return True
+
+    def release(self, host):
+        self._host(host).release()
+        self._workers.release()
+
+
+_slots = _FleetSlots()
+
+
+def _safe_scan(scan, ds, checkpoints, on_result=None, deadline=None):
+    try:
+        return scan(ds, checkpoints, on_result, deadline)
+    except Exception as e:
+        return {
+            "ds_id": ds.get("id"),
+            "ds_name": ds.get("name"),
+            "db_type": ds.get("db_type"),
+            "host": ds.get("host"),
+            "error": str(e),
+            "results": [],
+            "summary": summarize([]),
+            "duration_ms": None,
+        }
+
+
+def iter_fleet_scan(datasources, checkpoints, max_workers=None, max_per_host=None,
+                    on_result=None, scan=None, deadline_seconds=None):
+    """
+    Her datasource için scan_datasource() sonucunu, tamamlandıkça yield eder.
+    on_result(ds, result) her checkpoint sonucunda (worker thread'inden) çağrılır.
+    scan: scan_datasource yerine kullanılacak fonksiyon (ör. incremental scan).
+    deadline_seconds (varsayılan SCAN_DEADLINE_SECONDS, 0 = sınırsız) dolunca
+    çalışmamış checkpoint'ler TIMEOUT olarak döner; uzun kuyruklar taramayı uzatmaz.
+
+    Bir host kendi limitine ulaştığında (bu çağrıda ya da process genelinde)
+    o host'un bekleyen datasource'ları kuyrukta kalır; boşta kalan worker'lar
+    diğer host'lara geçer.
+    """
+    scan = scan or scan_datasource
+    if deadline_seconds is None:
+        deadline_seconds = SCAN_DEADLINE_SECONDS
+    deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+    max_workers = max(1, int(max_workers or FLEET_MAX_WORKERS))
+    max_per_host = max(1, int(max_per_host or FLEET_MAX_PER_HOST))
+
+    pending = deque(datasources)
+    running = {}        # future -> host
+    per_host = {}       # host -> running count
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fleet-scan") as pool:
+            while pending or running:
+                # Limitlere takılmayan datasource'ları kuyruktan çek
+                skipped = deque()
+                blocked = False     # başka job'lar process genelindeki slot'ları tutuyor
+                while pending and len(running) < max_workers:
+                    ds = pending.popleft()
+                    host = _host_key(ds)
+                    if per_host.get(host, 0) >= max_per_host:
+                        skipped.append(ds)
+                        continue
+                    if not _slots.try_acquire(host):
+                        skipped.append(ds)
+                        blocked = True
+                        continue
+                    per_host[host] = per_host.get(host, 0) + 1
+                    running[pool.submit(_safe_scan, scan, ds, checkpoints, on_result, deadline)] = host
+                skipped.extend(pending)
+                pending = skipped
+
+                if not running:
+                    time.sleep(_SLOT_POLL)
+                    continue
+                done, _ = wait(list(running), timeout=_SLOT_POLL if blocked else None,
+                               return_when=FIRST_COMPLETED)
+                for fut in done:
+                    host = running.pop(fut)
+                    per_host[host] -= 1
+                    _slots.release(host)
+                    yield fut.result()
+    finally:
+        # Tüketici erken bıraktıysa: executor çalışanları bitirdi, slot'ları geri ver
+        for host in running.values():
+            _slots.release(host)
+
+
+def scan_fleet(datasources, checkpoints, max_workers=None, max_per_host=None,
+               on_result=None, scan=None, deadline_seconds=None):
+    """iter_fleet_scan() sonuçlarını datasource adına göre sıralı liste olarak döner."""
+    scans = list(iter_fleet_scan(datasources, checkpoints, max_workers, max_per_host,
+                                 on_result, scan, deadline_seconds))
+    scans.sort(key=lambda s: (s.get("ds_name") or "").lower())
+    return scans
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental scan.
+
+Bir checkpoint yalnızca şu durumlarda yeniden çalıştırılır:
+  - fingerprint'i (Pre_SQL_Test + SQL_Test + Test_Condition) değişmişse,
+  - son sonucu ERROR ise ya da hiç sonucu yoksa,
+  - son sonucu INCREMENTAL_TTL_HOURS'tan eskiyse.
+Diğerlerinin son sonucu yeni run'a "carried_forward" olarak taşınır.
+"""
+import datetime
+import time
+
+from config import INCREMENTAL_TTL_HOURS
+from .engine import fingerprint, matching_checkpoints, scan_datasource, summarize
+
+
+def _needs_run(checkpoint, last, cutoff):
+    if last is None:
+        return True
+    if last["status"] in ("ERROR", "TIMEOUT"):
+        return True
+    if last["fingerprint"] != fingerprint(checkpoint):
+        return True
+    return last["executed_at"] is None or last["executed_at"] < cutoff
+
+
+def _carried(checkpoint, last):
+    return {
+        "checkpoint_id": checkpoint.get("id"),
+        "name": checkpoint.get("name"),
+        "severity": checkpoint.get("severity"),
+        "status": last["status"],
+        "result_value": last["result_value"],
+        "condition_expr": last["condition_expr"],
+        "error": last["error"],
+        "duration_ms": None,
+        "fingerprint": last["fingerprint"],
+        "executed_at": last["executed_at"],
+        "carried_forward": True,
+    }
+
+
+def plan(ds, checkpoints, last_results, ttl_hours=INCREMENTAL_TTL_HOURS):
+    """
+    (çalıştırılacak checkpoint'ler, taşınacak sonuçlar) döner.
+    last_results: store.load_last_results() çıktısı.
+    """
+    ds_id = ds.get("id")
+    cutoff = datetime.datetime.now() - datetime.timedelta(hours=ttl_hours)
+    to_run, carried = [], []
+    for checkpoint in matching_checkpoints(ds, checkpoints):
+        last = last_results.get((checkpoint.get("id"), ds_id))
+        if _needs_run(checkpoint, last, cutoff):
+            to_run.append(checkpoint)
+        else:
+            carried.append(_carried(checkpoint, last))
+    return to_run, carried
+
+
+def make_incremental_scan(last_results, ttl_hours=INCREMENTAL_TTL_HOURS):
+    """
+    scan_datasource ile aynı imzaya sahip bir fonksiyon döner; fleet
+    scheduler'a scan= olarak verilebilir.
+    """
+    def incremental_scan(ds, checkpoints, on_result=None, deadline=None):
+        started = time.monotonic()
+        to_run, carried = plan(ds, checkpoints, last_results, ttl_hours)
+
+        for res in carried:
+            if on_result:
+                on_result(ds, res)
+
+        if to_run:
+            scan = scan_datasource(ds, to_run, on_result, deadline)
+        else:
+            # Hiçbir şey değişmemiş: hedef veritabanına bağlanmaya gerek yok
+            scan = {
+                "ds_id": ds.get("id"),
+                "ds_name": ds.get("name"),
+                "db_type": (ds.get("db_type") or "").lower(),
+                "host": ds.get("host"),
+                "error": None,
+                "results": [],
+            }
+
+        scan["results"] = carried + scan["results"]
+        scan["carried_forward"] = len(carried)
+        scan["summary"] = summarize(scan["results"])
+        scan["duration_ms"] = round((time.monotonic() - started) * 1000, 2)
+        return scan
+
+    return incremental_scan
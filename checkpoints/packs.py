@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoint pack import / export.
+
+Pack, checkpoint tanımlarının (Id hariç) JSON ya da YAML listesidir;
+checkpoint'ler (Name, DB_Type) ile eşleştirilir. Import önce bir plan
+çıkarır (yeni / değişen / aynı / pack'te olmayan / hatalı), uygula denirse
+tüm INSERT ve UPDATE'ler executemany ile tek transaction'da yazılır.
+
+    {"format": "dbscan-checkpoint-pack", "version": 1,
+     "checkpoints": [{"name": ..., "db_type": "oracle", "sql_test": ..., ...}]}
+"""
+import datetime
+import json
+
+from db import get_db
+from .catalog import catalog
+from .conditions import compile_condition, ConditionError
+from .engine import SUPPORTED_DB_TYPES
+from .result_cache import invalidate_checkpoint
+from .search import invalidate_counts
+
+try:
+    import yaml
+except ImportError:     # YAML opsiyonel; JSON her zaman çalışır
+    yaml = None
+
+
+class PackError(ValueError):
+    """Pack okunamadı ya da formatı geçersiz."""
+
+
+PACK_FORMAT = "dbscan-checkpoint-pack"
+PACK_VERSION = 1
+PACK_FORMATS = ("json", "yaml")
+SEVERITIES = ("low", "medium", "high", "critical")
+
+# pack alanı -> checkpoints kolonu
+COLUMNS = {
+    "name": "Name",
+    "db_type": "DB_Type",
+    "severity": "Severity",
+    "description": "Description",
+    "pre_sql_test": "Pre_SQL_Test",
+    "sql_test": "SQL_Test",
+    "test_condition": "Test_Condition",
+    "pre_sql_detail": "Pre_SQL_Detail",
+    "sql_detail": "SQL_Detail",
+    "text_pass": "Text_Pass",
+    "text_fail": "Text_Fail",
+    "notes": "Notes",
+}
+FIELDS = tuple(COLUMNS)
+REQUIRED = ("name", "db_type", "sql_test", "sql_detail", "test_condition")
+
+_SELECT_SQL = "SELECT Id AS id, " + ", ".join(f"{c} AS {f}" for f, c in COLUMNS.items()) + " FROM checkpoints"
+_INSERT_SQL = (
+    "INSERT INTO checkpoints (" + ", ".join(COLUMNS.values()) + ") "
+    "VALUES (" + ", ".join(["%s"] * len(COLUMNS)) + ")"
+)
+_UPDATE_SQL = (
+    "UPDATE checkpoints SET " + ", ".join(f"{c}=%s" for c in COLUMNS.values()) + " WHERE Id=%s"
+)
+
+
+def available_formats():
+    """PyYAML kurulu değilse yalnızca JSON."""
+    return [f for f in PACK_FORMATS if f != "yaml" or yaml is not None]
+
+
+def _key(entry):
+    return ((entry.get("name") or "").strip().lower(), (entry.get("db_type") or "").strip().lower())
+
+
+def _norm(value):
+    """Karşılaştırma için: None == '', form'dan gelen CRLF == LF."""
+    if value is None:
+        return ""
+    return str(value).replace("\r\n", "\n").strip()
+
+
+# ---------- export ---------- #
+
+def export_pack(checkpoints, fmt="json"):
+    """Checkpoint listesini (catalog satırları) pack metnine çevirir."""
+    pack = {
+        "format": PACK_FORMAT,
+        "version": PACK_VERSION,
+        "exported_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "checkpoints": [
+            {f: cp.get(f) for f in FIELDS if cp.get(f) not in (None, "")}
+            for cp in sorted(checkpoints, key=lambda c: (_key(c)[1], _key(c)[0]))
+        ],
+    }
+    if fmt == "yaml":
+        if yaml is None:
+            raise PackError("PyYAML is not installed; export as JSON or install it in the virtualenv.")
+        return yaml.safe_dump(pack, sort_keys=False, allow_unicode=True, width=120)
+    return json.dumps(pack, indent=2, ensure_ascii=False)
+
+
+# ---------- import ---------- #
+
+def format_for(filename):
+    name = (filename or "").lower()
+    return "yaml" if name.endswith((".yaml", ".yml")) else "json"
+
+
+def parse_pack(data, fmt="json"):
+    """Pack metnini checkpoint dict listesine çevirir; yapı hatasında PackError."""
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+
+    if fmt == "yaml":
+        if yaml is None:
+            raise PackError("PyYAML is not installed; upload the pack as JSON.")
+        try:
+            pack = yaml.safe_load(data)
+        except yaml.YAMLError as e:
+            raise PackError(f"Invalid YAML: {e}")
+    else:
+        try:
+            pack = json.loads(data)
+        except ValueError as e:
+            raise PackError(f"Invalid JSON: {e}")
+
+    # Düz liste de kabul edilir
+    if isinstance(pack, dict):
+        if pack.get("format") not in (None, PACK_FORMAT):
+            raise PackError(f"Unknown pack format: {pack.get('format')!r}")
+        entries = pack.get("checkpoints")
+    else:
+        entries = pack
+    if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+        raise PackError("Pack must contain a list of checkpoint objects.")
+
+    return [
+        {f: (e.get(f) if e.get(f) is None else str(e.get(f))) for f in FIELDS}
+        for e in entries
+    ]
+
+
+def _validate(entry):
+    missing = [f for f in REQUIRED if not _norm(entry.get(f))]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if entry["db_type"].strip().lower() not in SUPPORTED_DB_TYPES:
+        return f"unsupported db_type {entry['db_type']!r}"
+    if (entry.get("severity") or "medium").strip().lower() not in SEVERITIES:
+        return f"invalid severity {entry['severity']!r}"
+    try:
+        compile_condition(entry["test_condition"])
+    except ConditionError as e:
+        return f"invalid test condition: {e}"
+    return None
+
+
+def _clean(entry):
+    entry = dict(entry)
+    entry["name"] = entry["name"].strip()
+    entry["db_type"] = entry["db_type"].strip().lower()
+    entry["severity"] = (entry.get("severity") or "medium").strip().lower()
+    return entry
+
+
+def plan_import(entries):
+    """
+    Pack'i repo'daki checkpoint'lerle karşılaştırır; hiçbir şey yazmaz.
+
+    Dönen dict: create (entry listesi), update ((id, entry, değişen alanlar)),
+    unchanged (adet), missing (repo'da olup pack'te olmayan, aynı db_type'lar
+    için), errors ((sıra, isim, mesaj)).
+    """
+    with get_db() as con, con.cursor() as cur:
+        cur.execute(_SELECT_SQL)
+        existing = {}
+        for row in cur.fetchall():
+            existing.setdefault(_key(row), []).append(row)
+
+    plan = {"create": [], "update": [], "unchanged": 0, "missing": [], "errors": []}
+    seen = set()
+
+    for i, raw in enumerate(entries, start=1):
+        error = _validate(raw)
+        if error:
+            plan["errors"].append((i, raw.get("name"), error))
+            continue
+        entry = _clean(raw)
+        key = _key(entry)
+        if key in seen:
+            plan["errors"].append((i, entry["name"], "duplicate name in pack"))
+            continue
+        seen.add(key)
+
+        rows = existing.get(key, [])
+        if not rows:
+            plan["create"].append(entry)
+        elif len(rows) > 1:
+            plan["errors"].append(
+                (i, entry["name"], f"{len(rows)} existing checkpoints share this name; rename them first")
+            )
+        else:
+            changed = [f for f in FIELDS if _norm(rows[0].get(f)) != _norm(entry.get(f))]
+            if changed:
+                plan["update"].append((rows[0]["id"], entry, changed))
+            else:
+                plan["unchanged"] += 1
+
+    db_types = {k[1] for k in seen}
+    plan["missing"] = sorted(
+        (row["name"], row["db_type"])
+        for key, rows in existing.items() if key[1] in db_types and key not in seen
+        for row in rows
+    )
+    return plan
+
+
+def apply_import(plan):
+    """
+    Plan'daki yeni ve değişen checkpoint'leri tek transaction'da yazar ve
+    cache'leri geçersiz kılar. Hatalı satır varsa hiçbir şey yazılmaz.
+    """
+    if plan["errors"]:
+        raise PackError(f"{len(plan['errors'])} checkpoint(s) in the pack are invalid; nothing was imported.")
+    if not plan["create"] and not plan["update"]:
+        return
+
+    inserts = [tuple(e.get(f) for f in FIELDS) for e in plan["create"]]
+    updates = [tuple(e.get(f) for f in FIELDS) + (cp_id,) for cp_id, e, _ in plan["update"]]
+
+    with get_db() as con, con.cursor() as cur:
+        con.begin()
+        try:
+            if inserts:
+                cur.executemany(_INSERT_SQL, inserts)
+            if updates:
+                cur.executemany(_UPDATE_SQL, updates)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+    invalidate_counts()
+    catalog.bump()
+    for cp_id, _, _ in plan["update"]:
+        invalidate_checkpoint(cp_id)
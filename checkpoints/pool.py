@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Hedef veritabanı bağlantı havuzu (ds_id bazında).
+
+Oracle / MSSQL login maliyeti yüksek olduğu için bağlantılar iş bitince
+kapatılmaz, aynı datasource'un bir sonraki kullanımına saklanır.
+
+Not: Pre SQL çalıştırılan bağlantı (ALTER SESSION / CURRENT_SCHEMA, USE db,
+SET seçenekleri) taint() ile işaretlenir ve release'te havuza geri konmaz,
+kapatılır; session ayarları bir sonraki kullanıcıya taşınmaz.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from config import (
+    TARGET_POOL_MAX_PER_DS,
+    TARGET_POOL_TIMEOUT,
+    TARGET_POOL_IDLE_TIMEOUT,
+    TARGET_POOL_PING_INTERVAL,
+)
+
+
+# Bağlantıyı etkileyen alanlar; biri değişirse eski bağlantılar kullanılmaz
+_SIGNATURE_FIELDS = (
+    "db_type", "host", "port", "auth_mode", "domain", "username", "password",
+    "database_name", "oracle_service_name", "oracle_sid",
+)
+
+_PING_SQL = {
+    "oracle": "select 1 from dual",
+    "mssql": "SELECT 1",
+}
+
+
+def ds_key(ds):
+    """Route'larda id, datasources tablosunda ds_id kullanılıyor."""
+    return ds.get("id") if ds.get("id") is not None else ds.get("ds_id")
+
+
+def _signature(ds):
+    return tuple(str(ds.get(f) or "") for f in _SIGNATURE_FIELDS)
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _reset_call_timeout(conn):
+    from .engine import set_call_timeout
+    set_call_timeout(conn, None)
+
+
+class _DsPool:
+    def __init__(self, signature):
+        self.signature = signature
+        self.idle = []          # [(conn, last_used)]
+        self.in_use = 0
+        self.generation = 0
+        self.checked_out = {}   # id(conn) -> generation
+        self.cond = threading.Condition()
+
+
+class TargetConnectionPool:
+    def __init__(self, max_per_ds=TARGET_POOL_MAX_PER_DS, timeout=TARGET_POOL_TIMEOUT,
+                 idle_timeout=TARGET_POOL_IDLE_TIMEOUT, ping_interval=TARGET_POOL_PING_INTERVAL):
+        self.max_per_ds = max_per_ds
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._janitor = None
+
+    # ---------- internals ---------- #
+
+    def _connect(self, ds):
+        from .engine import open_connection
+        return open_connection(ds)
+
+    def _ping(self, ds, conn):
+        db_type = (ds.get("db_type") or "").lower()
+        if hasattr(conn, "ping"):
+            conn.ping()
+            return
+        cur = conn.cursor()
+        try:
+            cur.execute(_PING_SQL.get(db_type, "SELECT 1"))
+            cur.fetchone()
+        finally:
+            cur.close()
+
+    def _pool_for(self, ds):
+        key = ds_key(ds)
+        sig = _signature(ds)
+        stale = []
+        with self._lock:
+            p = self._pools.get(key)
+            if p is None:
+                p = self._pools[key] = _DsPool(sig)
+            elif p.signature != sig:
+                # Datasource düzenlenmiş: boştaki eski bağlantıları at
+                with p.cond:
+                    stale, p.idle = [c for c, _ in p.idle], []
+                    p.signature = sig
+                    p.generation += 1
+        for conn in stale:
+            _close_quietly(conn)
+        self._start_janitor()
+        return p
+
+    def _start_janitor(self):
+        if self._janitor is not None:
+            return
+        with self._lock:
+            if self._janitor is None:
+                t = threading.Thread(target=self._janitor_loop, name="target-pool-janitor", daemon=True)
+                self._janitor = t
+                t.start()
+
+    def _janitor_loop(self):
+        while True:
+            time.sleep(max(5, self.idle_timeout / 4))
+            self.evict_idle()
+
+    # ---------- public API ---------- #
+
+    def acquire(self, ds):
+        p = self._pool_for(ds)
+        deadline = time.monotonic() + self.timeout
+
+        # Boştaki bağlantı aynı kilit altında alınır ve in_use'a sayılır;
+        # aksi halde iki thread aynı idle'ı görüp max_per_ds'i aşabilir
+        with p.cond:
+            while not p.idle and p.in_use >= self.max_per_ds:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(
+                        f"Connection pool for datasource {ds.get('name') or ds_key(ds)} is exhausted."
+                    )
+                p.cond.wait(remaining)
+            conn, used = p.idle.pop() if p.idle else (None, None)
+            p.in_use += 1
+
+        try:
+            if conn is not None:
+                if time.monotonic() - used < self.ping_interval:
+                    return self._checked_out(p, conn)
+                try:
+                    self._ping(ds, conn)
+                    return self._checked_out(p, conn)
+                except Exception:
+                    # Kopmuş session: aynı slot'la yeni bağlantı açılır
+                    _close_quietly(conn)
+            return self._checked_out(p, self._connect(ds))
+        except Exception:
+            with p.cond:
+                p.in_use -= 1
+                p.cond.notify()
+            raise
+
+    def _checked_out(self, p, conn):
+        with p.cond:
+            p.checked_out[id(conn)] = p.generation
+        return conn
+
+    def taint(self, conn):
+        """Session ayarları değişti (Pre SQL); bağlantı release'te kapatılır."""
+        with self._lock:
+            pools = list(self._pools.values())
+        for p in pools:
+            with p.cond:
+                if id(conn) in p.checked_out:
+                    # Hiçbir nesille eşleşmez; release'te kapatılır
+                    p.checked_out[id(conn)] = None
+                    return
+
+    def release(self, ds, conn, discard=False):
+        # Yalnızca arama: eski bir ds dict'i signature / generation'ı değiştirmesin
+        with self._lock:
+            p = self._pools.get(ds_key(ds))
+        if p is None:
+            _close_quietly(conn)
+            return
+        if not discard:
+            # Checkpoint'in sorgu zaman aşımı bir sonraki kullanıcıya taşınmasın
+            _reset_call_timeout(conn)
+        with p.cond:
+            p.in_use = max(0, p.in_use - 1)
+            # invalidate() sonrası dönen ya da taint() edilen bağlantı havuza alınmaz
+            generation = p.checked_out.pop(id(conn), None)
+            keep = not discard and generation == p.generation
+            if keep:
+                p.idle.append((conn, time.monotonic()))
+            p.cond.notify()
+        if not keep:
+            _close_quietly(conn)
+
+    @contextmanager
+    def connection(self, ds):
+        """
+        with target_pool.connection(ds) as conn: ...
+        Blok içinde hata çıkarsa bağlantı havuza geri konmaz, kapatılır.
+        """
+        conn = self.acquire(ds)
+        try:
+            yield conn
+        except BaseException:
+            self.release(ds, conn, discard=True)
+            raise
+        else:
+            self.release(ds, conn)
+
+    def invalidate(self, ds_id):
+        """Datasource düzenlendiğinde / silindiğinde boştaki bağlantıları kapatır."""
+        with self._lock:
+            p = self._pools.get(ds_id)
+        if p is None:
+            return
+        with p.cond:
+            idle, p.idle = p.idle, []
+            # Kullanımdaki bağlantılar release'te nesil uyuşmadığı için kapanacak
+            p.generation += 1
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        stale = []
+        with self._lock:
+            pools = list(self._pools.values())
+        for p in pools:
+            with p.cond:
+                stale.extend(c for c, used in p.idle if used < cutoff)
+                p.idle = [(c, used) for c, used in p.idle if used >= cutoff]
+        for conn in stale:
+            _close_quietly(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                key: {"idle": len(p.idle), "in_use": p.in_use}
+                for key, p in self._pools.items()
+            }
+
+
+target_pool = TargetConnectionPool()
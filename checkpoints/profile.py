@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Yavaş checkpoint profiler'ı.
+
+SQL_Test süreleri scan_results'tan (taşınan sonuçlar ve batch'ten eşit
+paylaştırılan süreler hariç; bunlar tekil ölçüm değildir), SQL_Detail
+süreleri ve satır sayıları detail_stats'tan okunur. Her checkpoint için
+p50 / p95, datasource'lar arası dağılım (datasource ortalamalarının
+standart sapması) ve fazın toplam süresindeki payı hesaplanır.
+"""
+import datetime
+import math
+import statistics
+
+from config import PROFILE_WINDOW_DAYS
+from db import get_db
+from .store import ensure_schema
+
+PHASES = {
+    "sql_test": """
+        SELECT checkpoint_id, ds_id, duration_ms, NULL AS row_count
+          FROM scan_results
+         WHERE executed_at >= %s
+           AND carried_forward = 0
+           AND batched = 0
+           AND duration_ms IS NOT NULL
+    """,
+    "sql_detail": """
+        SELECT checkpoint_id, ds_id, duration_ms, row_count
+          FROM detail_stats
+         WHERE executed_at >= %s
+    """,
+}
+
+SORT_KEYS = ("share", "p50", "p95", "spread", "runs")
+
+_FETCH_BATCH = 5000
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank yüzdelik."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _samples(phase, since):
+    """{checkpoint_id: {"durations": [...], "per_ds": {ds_id: [...]}, "rows": [...]}}"""
+    ensure_schema()
+    stats = {}
+    with get_db() as con, con.cursor() as cur:
+        cur.execute(PHASES[phase], (since,))
+        while True:
+            batch = cur.fetchmany(_FETCH_BATCH)
+            if not batch:
+                break
+            for r in batch:
+                item = stats.setdefault(r["checkpoint_id"], {"durations": [], "per_ds": {}, "rows": []})
+                ms = float(r["duration_ms"])
+                item["durations"].append(ms)
+                item["per_ds"].setdefault(r["ds_id"], []).append(ms)
+                if r["row_count"] is not None:
+                    item["rows"].append(r["row_count"])
+    return stats
+
+
+def rank_checkpoints(phase="sql_test", days=PROFILE_WINDOW_DAYS, sort="share", names=None):
+    """
+    Profiler satırlarını `sort` alanına göre azalan sırada döner.
+    names: {checkpoint_id: checkpoint dict} (ad / db_type göstermek için).
+    """
+    if phase not in PHASES:
+        raise ValueError(f"unknown phase: {phase}")
+    since = datetime.datetime.now() - datetime.timedelta(days=days)
+    stats = _samples(phase, since)
+    names = names or {}
+
+    grand_total = sum(sum(s["durations"]) for s in stats.values()) or 1.0
+    report = []
+    for cp_id, s in stats.items():
+        durations = sorted(s["durations"])
+        ds_means = [statistics.fmean(v) for v in s["per_ds"].values()]
+        total = sum(durations)
+        cp = names.get(cp_id) or {}
+        report.append({
+            "checkpoint_id": cp_id,
+            "name": cp.get("name") or f"#{cp_id} (deleted)",
+            "db_type": cp.get("db_type"),
+            "runs": len(durations),
+            "datasources": len(s["per_ds"]),
+            "p50": _percentile(durations, 50),
+            "p95": _percentile(durations, 95),
+            "max": durations[-1],
+            "spread": statistics.pstdev(ds_means) if len(ds_means) > 1 else 0.0,
+            "total_ms": total,
+            "share": total * 100.0 / grand_total,
+            "avg_rows": statistics.fmean(s["rows"]) if s["rows"] else None,
+        })
+
+    if sort not in SORT_KEYS:
+        sort = "share"
+    report.sort(key=lambda r: r[sort], reverse=True)
+    return report
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Interaktif run-test sonuç cache'i.
+
+Anahtar (checkpoint_id, ds_id, fingerprint, datasource bağlantı imzası)
+olduğundan SQL / condition ya da datasource ayarları değişince eski giriş
+zaten eşleşmez; registry başka bir process'te tazelense de bu geçerlidir.
+edit/delete ayrıca açıkça temizler.
+"""
+from cache import TTLCache
+from config import RESULT_CACHE_TTL, RESULT_CACHE_SIZE
+from .engine import fingerprint
+from .pool import _signature
+
+result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+
+
+def cache_key(checkpoint, ds):
+    return (checkpoint.get("id"), ds.get("id"), fingerprint(checkpoint), _signature(ds))
+
+
+def invalidate_checkpoint(checkpoint_id):
+    return result_cache.invalidate(lambda k: k[0] == checkpoint_id)
+
+
+def invalidate_datasource(ds_id):
+    return result_cache.invalidate(lambda k: k[1] == ds_id)
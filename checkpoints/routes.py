@@ -1,102 +1,55 @@
-from flask import render_template, request, redirect, url_for, flash, session
-from . import checkpoints_bp
+import datetime
+import logging
+import time
+
+from flask import (
+    Blueprint, render_template, request, redirect, url_for, flash, session, jsonify,
+    Response,
+)
+from werkzeug.utils import secure_filename
 from db import get_db
+from security import login_required
+from jobs import job_manager
+from config import CHECKPOINT_PAGE_SIZE, PROFILE_WINDOW_DAYS
+from .engine import (
+    SUPPORTED_DB_TYPES,
+    run_test,
+    is_timeout_error,
+    matching_checkpoints,
+)
+from .conditions import compile_condition, ConditionError
+from .detail import EXPORT_FORMATS, CountingCursor, open_detail_cursor, detail_cache
+from .fleet import iter_fleet_scan
+from .pool import target_pool
+from .incremental import make_incremental_scan
+from .store import create_run, ScanResultWriter, load_last_results, record_detail_stat
+from .result_cache import result_cache, cache_key, invalidate_checkpoint
+from .search import count_checkpoints, fetch_page, invalidate_counts
+from .catalog import catalog
+from .profile import PHASES, SORT_KEYS, rank_checkpoints
+from .packs import (
+    PACK_FORMATS, PackError, available_formats, export_pack, format_for, parse_pack,
+    plan_import, apply_import,
+)
+from datasources.registry import registry
+
+# template_folder vermiyoruz; app zaten /templates'i biliyor
+checkpoints_bp = Blueprint('checkpoints', __name__)
+
+log = logging.getLogger(__name__)
 
 
-# ---------- Helper functions ---------- #
-
-def get_oracle_connection(ds):
-    """
-    Oracle connection – datasources iş mantığıyla uyumlu.
-    """
-    try:
-        import oracledb
-    except ImportError:
-        raise RuntimeError("python-oracledb module is not installed. Please install it in the virtualenv.")
-
-    host = ds.get("host")
-    port = int(ds.get("port") or 1521)
-    user = ds.get("username")
-    pwd = ds.get("password")
-    service_name = ds.get("oracle_service_name")
-    sid = ds.get("oracle_sid")
-
-    if service_name:
-        dsn = oracledb.makedsn(host=host, port=port, service_name=service_name)
-    elif sid:
-        dsn = oracledb.makedsn(host=host, port=port, sid=sid)
-    else:
-        raise RuntimeError("Oracle requires service_name or SID.")
-
-    conn = oracledb.connect(user=user, password=pwd, dsn=dsn)
-    return conn
-
-
-def get_mssql_connection(ds):
-    """
-    MSSQL connection – pyodbc + ODBC Driver 18 ile.
-    """
-    try:
-        import pyodbc
-    except ImportError:
-        raise RuntimeError("pyodbc module is not installed. Please install it in the virtualenv.")
-
-    host = ds.get("host")
-    port = int(ds.get("port") or 1433)
-    auth_mode = ds.get("auth_mode") or "sql"
-    username = ds.get("username")
-    password = ds.get("password")
-
-    # DB alanını düzgün normalize edelim
-    database_raw = ds.get("database_name")
-    database = (database_raw or "").strip()
-    if database.lower() == "none":
-        database = ""
-
-    driver = "{ODBC Driver 18 for SQL Server}"
-
-    if auth_mode == "sql":
-        db_part = f"DATABASE={database};" if database else ""
-        conn_str = (
-            f"DRIVER={driver};"
-            f"SERVER={host},{port};"
-            f"{db_part}"
-            f"UID={username};PWD={password};"
-            "Encrypt=no;"
-            "TrustServerCertificate=yes;"
-        )
-    else:
-        db_part = f"DATABASE={database};" if database else ""
-        conn_str = (
-            f"DRIVER={driver};"
-            f"SERVER={host},{port};"
-            f"{db_part}"
-            "Trusted_Connection=yes;"
-            "Encrypt=no;"
-            "TrustServerCertificate=yes;"
-        )
-
-    return pyodbc.connect(conn_str)
-
-
-def evaluate_condition(result_value, condition_text):
-    """
-    result_value: SQL_Test'ten dönen ilk kolon (int/float/str/None)
-    condition_text: ör. '> 0', '== 0', "== 'OPEN'"
-    """
-    if not condition_text:
-        return None, None
-
-    expr = f"{repr(result_value)} {condition_text}"
+# ---------- LIST ---------- #
+def _cursor_arg(prefix):
+    """?after_name=..&after_id=.. gibi keyset anahtarını (name, id) olarak okur."""
+    name = request.args.get(f'{prefix}_name')
     try:
-        value = bool(eval(expr, {"__builtins__": {}}))
-    except Exception as e:
-        return None, f"Condition evaluation error: {e} (expr={expr})"
-
-    return (value, expr), None
+        cp_id = int(request.args.get(f'{prefix}_id', ''))
+    except ValueError:
+        return None
+    return None if name is None else (name, cp_id)
 
 
-# ---------- LIST ---------- #
 @checkpoints_bp.route('/')
 def list_checkpoints():
     db = get_db()
@@ -110,73 +63,45 @@ def list_checkpoints():
     else:
         search = session.get('cp_search', '').strip()
 
-    # --- Pagination params ---
+    # --- Pagination params (keyset: OFFSET yok) ---
     try:
         page = int(request.args.get('page', 1))
     except (TypeError, ValueError):
         page = 1
 
+    after = _cursor_arg('after')
+    before = None if after else _cursor_arg('before')
+    if not after and not before:
+        page = 1
     if page < 1:
         page = 1
 
-    per_page = 15  # her sayfada kaç checkpoint gösterileceği
-
-    # --- Dinamik WHERE ---
-    where_clause = ""
-    params_count = []
-
-    if search:
-        where_clause = """
-            WHERE
-                Name LIKE %s
-                OR DB_Type LIKE %s
-                OR Severity LIKE %s
-        """
-        like = f"%{search}%"
-        params_count = [like, like, like]
-
-    # --- Toplam kayıt sayısı ---
-    cursor.execute(f"SELECT COUNT(*) AS cnt FROM checkpoints {where_clause}", params_count)
-    total_records = cursor.fetchone()["cnt"]
-
-    # --- Sayfa / offset hesapla ---
-    if total_records == 0:
-        total_pages = 1
-        page = 1
-        offset = 0
-    else:
-        total_pages = (total_records + per_page - 1) // per_page
-        if page > total_pages:
-            page = total_pages
-        offset = (page - 1) * per_page
+    per_page = CHECKPOINT_PAGE_SIZE  # her sayfada kaç checkpoint gösterileceği
+
+    # --- Toplam kayıt sayısı (arama başına kısa süre cache'li) ---
+    total_records = count_checkpoints(cursor, search)
+    total_pages = max(1, (total_records + per_page - 1) // per_page)
 
     # --- İlgili sayfadaki kayıtlar ---
-    params_rows = params_count + [per_page, offset]
-
-    cursor.execute(
-        f"""
-        SELECT
-            Id AS id,
-            Name AS name,
-            DB_Type AS db_type,
-            Severity AS severity
-        FROM checkpoints
-        {where_clause}
-        ORDER BY Name ASC
-        LIMIT %s OFFSET %s
-        """,
-        params_rows,
-    )
+    rows, has_more = fetch_page(cursor, search, per_page, after=after, before=before)
 
-    rows = cursor.fetchall()
+    if before and not has_more:
+        page = 1                        # geri gelirken başa ulaştık
+    has_prev = bool(after) or (bool(before) and has_more)
+    has_next = has_more if not before else True
+    if not rows:
+        has_next = False
+    page = min(page, total_pages)
 
     # Gösterilen satır aralığı
-    if total_records == 0:
+    if not rows:
         start_record = 0
         end_record = 0
     else:
-        start_record = offset + 1
-        end_record = min(offset + per_page, total_records)
+        start_record = (page - 1) * per_page + 1
+        end_record = start_record + len(rows) - 1
+
+    first, last = (rows[0], rows[-1]) if rows else (None, None)
 
     return render_template(
         "checkpoints/list.html",
@@ -188,6 +113,10 @@ def list_checkpoints():
         start_record=start_record,
         end_record=end_record,
         search=search,
+        has_prev=has_prev,
+        has_next=has_next,
+        first_row=first,
+        last_row=last,
     )
 
 
@@ -213,6 +142,12 @@ def new_checkpoint():
             flash('Name, DB Type, SQL Test ve SQL Detail and condition field must be entered.', 'danger')
             return render_template('checkpoints/form.html', mode='new', checkpoint=request.form)
 
+        try:
+            compile_condition(test_condition)
+        except ConditionError as e:
+            flash(f'Invalid test condition: {e}', 'danger')
+            return render_template('checkpoints/form.html', mode='new', checkpoint=request.form)
+
         db = get_db()
         cursor = db.cursor()
 
@@ -231,6 +166,8 @@ def new_checkpoint():
         ))
 
         db.commit()
+        invalidate_counts()
+        catalog.bump()
         new_id = cursor.lastrowid
 
         flash('Checkpoint başarıyla oluşturuldu.', 'success')
@@ -281,6 +218,14 @@ def edit_checkpoint(checkpoint_id):
             checkpoint['id'] = checkpoint_id
             return render_template('checkpoints/form.html', mode='edit', checkpoint=checkpoint)
 
+        try:
+            compile_condition(test_condition)
+        except ConditionError as e:
+            flash(f'Invalid test condition: {e}', 'danger')
+            checkpoint = dict(request.form)
+            checkpoint['id'] = checkpoint_id
+            return render_template('checkpoints/form.html', mode='edit', checkpoint=checkpoint)
+
         cursor.execute("""
             UPDATE checkpoints SET
                 Name=%s, DB_Type=%s, Severity=%s, Description=%s,
@@ -296,6 +241,9 @@ def edit_checkpoint(checkpoint_id):
             checkpoint_id
         ))
         db.commit()
+        invalidate_counts()
+        catalog.bump()
+        invalidate_checkpoint(checkpoint_id)
 
         flash('Checkpoint has been updated successfully.', 'success')
         return redirect(url_for('checkpoints.edit_checkpoint', checkpoint_id=checkpoint_id))
@@ -331,44 +279,23 @@ def edit_checkpoint(checkpoint_id):
 
 @checkpoints_bp.route('/<int:checkpoint_id>/run-test', methods=['GET', 'POST'])
 def run_checkpoint_test(checkpoint_id):
-    db = get_db()
-    cursor = db.cursor()
-
-    cursor.execute("""
-        SELECT 
-            Id AS id, Name AS name, DB_Type AS db_type,
-            Severity AS severity, Description AS description,
-            Pre_SQL_Test AS pre_sql_test,
-            SQL_Test AS sql_test,
-            Test_Condition AS test_condition
-        FROM checkpoints
-        WHERE Id=%s
-    """, (checkpoint_id,))
-    checkpoint = cursor.fetchone()
+    """
+    Checkpoint'i seçilen datasource'ta çalıştırır. Hedef SQL request
+    thread'inde değil job olarak çalışır; sayfa job bitene kadar bekler ve
+    sonucu ?job_id= ile gösterir. Cache'teki sonuç doğrudan gösterilir.
+    """
+    checkpoint = catalog.get(checkpoint_id)
 
     if not checkpoint:
         flash('Checkpoint bulunamadı.', 'danger')
         return redirect(url_for('checkpoints.list_checkpoints'))
 
-    cursor.execute("""
-        SELECT 
-            ds_id AS id, ds_name AS name,
-            db_type, host, port,
-            auth_mode, domain,
-            username, password,
-            database_name,
-            oracle_service_name, oracle_sid
-        FROM datasources
-        WHERE db_type=%s
-        ORDER BY ds_name
-    """, (checkpoint['db_type'],))
-    datasources = cursor.fetchall()
+    datasources = registry.choices(checkpoint['db_type'])
 
     selected_ds = None
-    result_value = None
-    condition_expr = None
-    status = None
-    error_message = None
+    res = None
+    job_id = None
+    cached_age = None
 
     if request.method == 'POST':
         ds_id = request.form.get('datasource_id')
@@ -376,108 +303,101 @@ def run_checkpoint_test(checkpoint_id):
         if not ds_id:
             flash("Please select a datasource.", "danger")
         else:
-            selected_ds = next((d for d in datasources if str(d["id"]) == ds_id), None)
+            selected_ds = _resolve_ds(ds_id, checkpoint['db_type'])
             if not selected_ds:
                 flash("Datasource not found.", "danger")
             else:
+                key = cache_key(checkpoint, selected_ds)
+                res = None if request.form.get('force_refresh') else result_cache.get(key)
 
-                # ---------- CONNECT ----------
-                try:
-                    if checkpoint["db_type"] == "oracle":
-                        conn = get_oracle_connection(selected_ds)
-                    elif checkpoint["db_type"] == "mssql":
-                        conn = get_mssql_connection(selected_ds)
-                    else:
-                        raise RuntimeError("Unsupported DB")
-                except Exception as e:
-                    status = "ERROR"
-                    error_message = str(e)
+                if res is not None:
+                    cached_age = int(result_cache.age(key) or 0)
                 else:
-                    try:
-                        cur = conn.cursor()
-
-                        # ----------- PRE SQL -------------
-                        pre_sql = checkpoint.get("pre_sql_test")
-                        if pre_sql:
-                            try:
-                                for stmt in pre_sql.split(";"):
-                                    if stmt.strip():
-                                        cur.execute(stmt)
-                                conn.commit()
-                            except Exception as e:
-                                status = "ERROR"
-                                error_message = f"Pre SQL Test error: {e}"
-                                cur.close()
-                                conn.close()
-                                return render_template(
-                                    "checkpoints/run_test.html",
-                                    checkpoint=checkpoint,
-                                    datasources=datasources,
-                                    selected_ds=selected_ds,
-                                    status=status,
-                                    error_message=error_message,
-                                    result_value=None,
-                                    condition_expr=None
-                                )
-
-                        # ----------- SQL TEST -------------
-                        sql_test = checkpoint.get("sql_test")
-                        try:
-                            cur.execute(sql_test)
-                            row = cur.fetchone()
-                        except Exception as e:
-                            status = "ERROR"
-                            error_message = f"SQL Test error: {e}"
-                            cur.close()
-                            conn.close()
-                            return render_template(
-                                "checkpoints/run_test.html",
-                                checkpoint=checkpoint,
-                                datasources=datasources,
-                                selected_ds=selected_ds,
-                                status=status,
-                                error_message=error_message,
-                                result_value=None,
-                                condition_expr=None
-                            )
-
-                        cur.close()
-                        conn.close()
-
-                        if not row:
-                            status = "ERROR"
-                            error_message = "SQL Test returned no rows."
-                        else:
-                            result_value = row[0]
-                            cond_text = checkpoint.get("test_condition")
-
-                            eval_result, eval_error = evaluate_condition(result_value, cond_text)
-                            if eval_error:
-                                status = "ERROR"
-                                error_message = eval_error
-                            else:
-                                if eval_result is None:
-                                    status = "NO_CONDITION"
-                                else:
-                                    ok, condition_expr = eval_result
-                                    status = "PASS" if ok else "FAIL"
-
-                    except Exception as e:
-                        status = "ERROR"
-                        error_message = str(e)
+                    job = _submit_test_job(checkpoint, selected_ds, key)
+                    if request.headers.get("X-Requested-With") == "fetch":
+                        return _job_response(job, None)
+                    return redirect(url_for('checkpoints.run_checkpoint_test',
+                                            checkpoint_id=checkpoint_id, job_id=job.id))
+
+    elif request.args.get('job_id'):
+        job, res = _finished_job(request.args['job_id'], "run-test")
+        if job is None:
+            flash("Result expired. Please run the test again.", "warning")
+        else:
+            selected_ds = _resolve_ds(job.meta.get("ds_id"), checkpoint['db_type'])
+            if res is None:
+                job_id = job.id
 
     return render_template(
         "checkpoints/run_test.html",
         checkpoint=checkpoint,
         datasources=datasources,
         selected_ds=selected_ds,
-        status=status,
-        error_message=error_message,
-        result_value=result_value,
-        condition_expr=condition_expr
+        status=res and res["status"],
+        error_message=res and res["error"],
+        result_value=res and res["result_value"],
+        condition_expr=res and res["condition_expr"],
+        cached_age=cached_age,
+        job_id=job_id,
+    )
+
+
+def _submit_test_job(checkpoint, ds, key):
+    owner = _session_owner()
+
+    def work(job):
+        # ---------- CONNECT ----------
+        try:
+            conn = target_pool.acquire(ds)
+        except Exception as e:
+            job.add_result({"status": "ERROR", "error": str(e),
+                            "result_value": None, "condition_expr": None})
+            return
+
+        res = None
+        try:
+            res = run_test(conn, checkpoint, ds)
+        finally:
+            # Zaman aşımında iptal edilen session havuza dönmez
+            target_pool.release(ds, conn, discard=res is None or res["status"] == "TIMEOUT")
+
+        _save_test_result(ds, res, owner)
+        # Bağlantı / SQL hataları ve zaman aşımları cache'lenmez; tekrar denemede yeniden çalışsın
+        if res["status"] not in ("ERROR", "TIMEOUT"):
+            result_cache.set(key, res)
+        job.add_result(dict(res, result_value=_jsonable(res["result_value"])))
+
+    return job_manager.submit(
+        "run-test", work, total=1, owner=_session_user_id(), quick=True,
+        meta={"checkpoint_id": checkpoint["id"], "ds_id": ds["id"], "ds_name": ds["name"]},
     )
 
 
+def _save_test_result(ds, res, owner):
+    """Tekil run-test sonucunu da scan_results'a yazar; hata ekranı bozmasın."""
+    try:
+        writer = ScanResultWriter(create_run("test", owner, 1))
+        writer.add(ds, res)
+        writer.close("done")
+    except Exception as e:
+        log.warning("Could not persist run-test result: %s", e)
+
+
+def _finished_job(job_id, kind):
+    """
+    Oturumdaki kullanıcının job'ı ve (bittiyse) tek sonucu: (job, res).
+    Job yoksa / başkasınınsa (None, None); sürüyorsa (job, None).
+    """
+    job = job_manager.get(job_id, owner=_session_user_id())
+    if job is None or job.kind != kind:
+        return None, None
+    if job.status == "error":
+        return job, {"status": "ERROR", "error": job.error, "result_value": None, "condition_expr": None}
+    if job.status != "done":
+        return job, None
+    return job, job.result()
+
+
 
 # =====================================================================
 # ----------------------- RUN SQL DETAIL ------------------------------
@@ -485,43 +405,27 @@ def run_checkpoint_test(checkpoint_id):
 
 @checkpoints_bp.route('/<int:checkpoint_id>/run-sql-detail', methods=['GET', 'POST'])
 def run_checkpoint_detail(checkpoint_id):
-    db = get_db()
-    cursor = db.cursor()
-
-    cursor.execute("""
-        SELECT 
-            Id AS id, Name AS name, DB_Type AS db_type,
-            Severity AS severity, Description AS description,
-            Pre_SQL_Detail AS pre_sql_detail,
-            SQL_Detail AS sql_detail
-        FROM checkpoints
-        WHERE Id=%s
-    """, (checkpoint_id,))
-    checkpoint = cursor.fetchone()
+    """
+    SQL Detail job olarak çalışır: cursor açılır, ilk sayfa okunur ve
+    detail_cache'e alınır. Sayfa job bitince ?job_id= ile ilk sayfayı
+    bellekten gösterir; devamı /detail-pages/<token> ile gelir.
+    """
+    checkpoint = catalog.get(checkpoint_id)
 
     if not checkpoint:
         flash('Checkpoint bulunamadı.', 'danger')
         return redirect(url_for('checkpoints.list_checkpoints'))
 
-    cursor.execute("""
-        SELECT 
-            ds_id AS id, ds_name AS name,
-            db_type, host, port,
-            auth_mode, domain,
-            username, password,
-            database_name,
-            oracle_service_name, oracle_sid
-        FROM datasources
-        WHERE db_type=%s
-        ORDER BY ds_name
-    """, (checkpoint['db_type'],))
-    datasources = cursor.fetchall()
+    datasources = registry.choices(checkpoint['db_type'])
 
     selected_ds = None
     detail_columns = []
     detail_rows = []
+    detail_token = None
+    detail_page = None
     status = None
     error_message = None
+    job_id = None
 
     if request.method == 'POST':
         ds_id = request.form.get('datasource_id')
@@ -529,77 +433,39 @@ def run_checkpoint_detail(checkpoint_id):
         if not ds_id:
             flash("Please select a datasource.", "danger")
         else:
-            selected_ds = next((d for d in datasources if str(d["id"]) == ds_id), None)
+            selected_ds = _resolve_ds(ds_id, checkpoint['db_type'])
 
-            try:
-                if checkpoint["db_type"] == "oracle":
-                    conn = get_oracle_connection(selected_ds)
-                elif checkpoint["db_type"] == "mssql":
-                    conn = get_mssql_connection(selected_ds)
-                else:
-                    raise RuntimeError("Unsupported DB")
-            except Exception as e:
-                status = "ERROR"
-                error_message = str(e)
+            if not selected_ds:
+                flash("Datasource not found.", "danger")
             else:
-                try:
-                    cur = conn.cursor()
-
-                    # ------- PRE SQL DETAIL -------
-                    pre_sql = checkpoint.get("pre_sql_detail")
-                    if pre_sql:
-                        try:
-                            for stmt in pre_sql.split(";"):
-                                if stmt.strip():
-                                    cur.execute(stmt)
-                            conn.commit()
-                        except Exception as e:
-                            status = "ERROR"
-                            error_message = f"Pre SQL Detail error: {e}"
-                            cur.close()
-                            conn.close()
-                            return render_template(
-                                "checkpoints/run_detail.html",
-                                checkpoint=checkpoint,
-                                datasources=datasources,
-                                selected_ds=selected_ds,
-                                status=status,
-                                error_message=error_message,
-                                detail_columns=[],
-                                detail_rows=[]
-                            )
-
-                    # ------- SQL DETAIL -------
-                    try:
-                        cur.execute(checkpoint["sql_detail"])
-                        rows = cur.fetchall()
-                        cols = [desc[0] for desc in cur.description] if cur.description else []
-                    except Exception as e:
-                        status = "ERROR"
-                        error_message = f"SQL Detail error: {e}"
-                        cur.close()
-                        conn.close()
-                        return render_template(
-                            "checkpoints/run_detail.html",
-                            checkpoint=checkpoint,
-                            datasources=datasources,
-                            selected_ds=selected_ds,
-                            status=status,
-                            error_message=error_message,
-                            detail_columns=[],
-                            detail_rows=[]
-                        )
-
-                    cur.close()
-                    conn.close()
-
-                    detail_columns = cols
-                    detail_rows = [dict(zip(cols, r)) for r in rows]
-                    status = "OK"
-
-                except Exception as e:
+                job = _submit_detail_job(checkpoint, selected_ds)
+                if request.headers.get("X-Requested-With") == "fetch":
+                    return _job_response(job, None)
+                return redirect(url_for('checkpoints.run_checkpoint_detail',
+                                        checkpoint_id=checkpoint_id, job_id=job.id))
+
+    elif request.args.get('job_id'):
+        job, res = _finished_job(request.args['job_id'], "run-detail")
+        if job is None:
+            flash("Result expired. Please run SQL Detail again.", "warning")
+        else:
+            selected_ds = _resolve_ds(job.meta.get("ds_id"), checkpoint['db_type'])
+            if res is None:
+                job_id = job.id
+            elif res["status"] != "OK":
+                status = res["status"]
+                error_message = res["error"]
+            else:
+                # İlk sayfa job'da okundu; burada bellekten gelir
+                detail_page = detail_cache.page(res["token"], 0, owner=_session_owner())
+                if detail_page is None:
                     status = "ERROR"
-                    error_message = str(e)
+                    error_message = "Result expired. Please run SQL Detail again."
+                else:
+                    detail_token = res["token"]
+                    detail_columns = detail_page["columns"]
+                    detail_rows = detail_page["rows"]
+                    status = "OK"
 
     return render_template(
         "checkpoints/run_detail.html",
@@ -609,7 +475,147 @@ def run_checkpoint_detail(checkpoint_id):
         status=status,
         error_message=error_message,
         detail_columns=detail_columns,
-        detail_rows=detail_rows
+        detail_rows=detail_rows,
+        detail_token=detail_token,
+        detail_page=detail_page,
+        job_id=job_id,
+    )
+
+
+def _submit_detail_job(checkpoint, ds):
+    owner = _session_owner()
+
+    def work(job):
+        # Bu datasource'taki eski viewer'lar havuzu tüketmesin
+        detail_cache.make_room(ds)
+        try:
+            conn = target_pool.acquire(ds)
+        except Exception as e:
+            job.add_result({"status": "ERROR", "error": str(e)})
+            return
+
+        # ------- PRE SQL DETAIL + SQL DETAIL -------
+        started = time.monotonic()
+        try:
+            cur, cols = open_detail_cursor(conn, checkpoint, ds=ds)
+        except Exception as e:
+            target_pool.release(ds, conn, discard=is_timeout_error(e))
+            job.add_result({"status": "TIMEOUT" if is_timeout_error(e) else "ERROR", "error": str(e)})
+            return
+
+        token = detail_cache.open(
+            ds, conn, cur, cols, owner=owner,
+            checkpoint_id=checkpoint['id'], exec_seconds=time.monotonic() - started,
+        )
+        try:
+            detail_cache.page(token, 0)
+        except Exception as e:
+            job.add_result({"status": "ERROR", "error": f"SQL Detail error: {e}"})
+            return
+        job.add_result({"status": "OK", "error": None, "token": token})
+
+    return job_manager.submit(
+        "run-detail", work, total=1, owner=_session_user_id(), quick=True,
+        meta={"checkpoint_id": checkpoint["id"], "ds_id": ds["id"], "ds_name": ds["name"]},
+    )
+
+
+def _resolve_ds(ds_id, db_type):
+    """Seçilen datasource'un tam kaydı (registry'den, O(1)); tip uyuşmazsa None."""
+    ds = registry.get(ds_id) if ds_id else None
+    if ds and (ds.get("db_type") or "").lower() == (db_type or "").lower():
+        return ds
+    return None
+
+
+def _session_owner():
+    return (session.get("user") or {}).get("username")
+
+
+def _session_user_id():
+    return (session.get("user") or {}).get("user_id")
+
+
+@checkpoints_bp.route('/detail-pages/<token>', methods=['GET'])
+def detail_pages(token):
+    """
+    Paged SQL Detail: ?page=N (0'dan başlar). Cursor süresi dolduysa 404.
+    """
+    try:
+        page = detail_cache.page(token, request.args.get('page', 0, type=int), owner=_session_owner())
+    except Exception as e:
+        return jsonify({"ok": False, "message": f"SQL Detail error: {e}"}), 500
+    if page is None:
+        return jsonify({"ok": False, "message": "Result expired. Please run SQL Detail again."}), 404
+    return jsonify(dict(page, ok=True))
+
+
+@checkpoints_bp.route('/<int:checkpoint_id>/export-detail', methods=['GET', 'POST'])
+def export_checkpoint_detail(checkpoint_id):
+    """
+    SQL Detail sonucunu CSV / NDJSON olarak stream eder.
+    Satırlar fetchmany ile parça parça okunur; bellek kullanımı sonuç
+    boyutundan bağımsızdır.
+    """
+    fmt = (request.values.get('format') or 'csv').lower()
+    ds_id = request.values.get('datasource_id')
+
+    if fmt not in EXPORT_FORMATS:
+        flash(f"Unsupported export format: {fmt}", "danger")
+        return redirect(url_for('checkpoints.run_checkpoint_detail', checkpoint_id=checkpoint_id))
+
+    checkpoint = catalog.get(checkpoint_id)
+
+    if not checkpoint:
+        flash('Checkpoint bulunamadı.', 'danger')
+        return redirect(url_for('checkpoints.list_checkpoints'))
+
+    selected_ds = _resolve_ds(ds_id, checkpoint['db_type'])
+
+    if not selected_ds:
+        flash("Please select a datasource.", "danger")
+        return redirect(url_for('checkpoints.run_checkpoint_detail', checkpoint_id=checkpoint_id))
+
+    try:
+        conn = target_pool.acquire(selected_ds)
+    except Exception as e:
+        flash(str(e), "danger")
+        return redirect(url_for('checkpoints.run_checkpoint_detail', checkpoint_id=checkpoint_id))
+
+    started = time.monotonic()
+    try:
+        cur, cols = open_detail_cursor(conn, checkpoint, ds=selected_ds)
+    except Exception as e:
+        target_pool.release(selected_ds, conn, discard=is_timeout_error(e))
+        flash(str(e), "danger")
+        return redirect(url_for('checkpoints.run_checkpoint_detail', checkpoint_id=checkpoint_id))
+
+    mimetype, writer = EXPORT_FORMATS[fmt]
+
+    counting = CountingCursor(cur)
+
+    def generate():
+        ok = False
+        try:
+            yield from writer(counting, cols)
+            ok = True
+        finally:
+            try:
+                cur.close()
+            except Exception:
+                pass
+            # Yarıda kesilen stream'in bağlantısı havuza geri konmaz
+            target_pool.release(selected_ds, conn, discard=not ok)
+            record_detail_stat(
+                checkpoint['id'], selected_ds['id'], (time.monotonic() - started) * 1000,
+                counting.row_count, complete=ok,
+            )
+
+    filename = secure_filename(f"{checkpoint['name']}_{selected_ds['name']}.{fmt}") or f"detail.{fmt}"
+    return Response(
+        generate(),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
@@ -633,6 +639,261 @@ def delete_checkpoint(checkpoint_id):
     # Silme işlemi
     cursor.execute("DELETE FROM checkpoints WHERE Id = %s", (checkpoint_id,))
     db.commit()
+    invalidate_counts()
+    catalog.bump()
+    invalidate_checkpoint(checkpoint_id)
 
     flash(f"Checkpoint '{row['Name']}' silindi.", 'success')
     return redirect(url_for('checkpoints.list_checkpoints'))
+
+
+
+# =====================================================================
+# ----------------------------- SCAN ---------------------------------
+# =====================================================================
+
+def _scan_ds(ds_id):
+    ds = registry.get(ds_id)
+    if ds and (ds.get("db_type") or "").lower() in SUPPORTED_DB_TYPES:
+        return ds
+    return None
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _submit_scan_job(kind, datasources, checkpoints, incremental=False):
+    """
+    Taramayı arka planda başlatır; her checkpoint sonucu job'a kısmi sonuç
+    olarak eklenir. incremental=True ise değişmeyen checkpoint'lerin son
+    sonucu taşınır (bkz. incremental.py).
+    """
+    total = sum(len(matching_checkpoints(ds, checkpoints)) for ds in datasources)
+    run_id = create_run(kind, _session_owner(), total)
+    scan = None
+    if incremental:
+        scan = make_incremental_scan(load_last_results([ds["id"] for ds in datasources]))
+
+    def work(job):
+        writer = ScanResultWriter(run_id)
+
+        def on_result(ds, res):
+            writer.add(ds, res)
+            item = dict(res, ds_id=ds.get("id"), ds_name=ds.get("name"))
+            item["result_value"] = _jsonable(item["result_value"])
+            job.add_result(item)
+
+        try:
+            for _scan in iter_fleet_scan(datasources, checkpoints, on_result=on_result, scan=scan):
+                pass
+        except Exception:
+            writer.close("error")
+            raise
+        writer.close("done")
+
+    meta = {
+        "datasources": [ds["name"] for ds in datasources],
+        "run_id": run_id,
+        "incremental": incremental,
+    }
+    return job_manager.submit(kind, work, total=total, meta=meta, owner=_session_user_id())
+
+
+def _job_response(job, template, **ctx):
+    """fetch ile gelindiyse (ya da template yoksa) 202 + JSON, normal form POST'unda sayfa."""
+    if template is None or request.headers.get("X-Requested-With") == "fetch":
+        return jsonify({
+            "job_id": job.id,
+            "status_url": url_for('checkpoints.job_status', job_id=job.id),
+        }), 202
+    return render_template(template, job_id=job.id, **ctx)
+
+
+@checkpoints_bp.route('/scan', methods=['GET', 'POST'])
+@login_required
+def scan_checkpoints():
+    """
+    Seçilen datasource için tüm checkpoint'leri tek bağlantı üzerinden çalıştırır.
+    """
+    datasources = registry.choices(SUPPORTED_DB_TYPES)
+    selected_ds = None
+
+    if request.method == 'POST':
+        selected_ds = _scan_ds(request.form.get('datasource_id'))
+
+        if not selected_ds:
+            flash("Please select a datasource.", "danger")
+        else:
+            checkpoints = catalog.for_db_type(selected_ds["db_type"])
+            job = _submit_scan_job(
+                "scan", [selected_ds], checkpoints,
+                incremental=bool(request.form.get('incremental')),
+            )
+            return _job_response(
+                job, "checkpoints/scan.html",
+                datasources=datasources, selected_ds=selected_ds,
+            )
+
+    return render_template(
+        "checkpoints/scan.html",
+        datasources=datasources,
+        selected_ds=selected_ds,
+        job_id=None,
+    )
+
+
+@checkpoints_bp.route('/fleet-scan', methods=['GET', 'POST'])
+@login_required
+def fleet_scan():
+    """
+    Seçilen datasource'ların hepsini paralel tarar (bkz. checkpoints/fleet.py).
+    """
+    datasources = registry.choices(SUPPORTED_DB_TYPES)
+    selected_ids = set()
+
+    if request.method == 'POST':
+        selected_ids = set(request.form.getlist('datasource_id'))
+        selected = [ds for ds in map(_scan_ds, sorted(selected_ids)) if ds]
+
+        if not selected:
+            flash("Please select at least one datasource.", "danger")
+        else:
+            checkpoints = []
+            for db_type in sorted({d["db_type"] for d in selected}):
+                checkpoints.extend(catalog.for_db_type(db_type))
+            job = _submit_scan_job(
+                "fleet", selected, checkpoints,
+                incremental=bool(request.form.get('incremental')),
+            )
+            return _job_response(
+                job, "checkpoints/fleet.html",
+                datasources=datasources, selected_ids=selected_ids,
+            )
+
+    return render_template(
+        "checkpoints/fleet.html",
+        datasources=datasources,
+        selected_ids=selected_ids,
+        job_id=None,
+    )
+
+
+# =====================================================================
+# ------------------------ PACK IMPORT / EXPORT ----------------------
+# =====================================================================
+
+@checkpoints_bp.route('/export-pack', methods=['GET'])
+@login_required
+def export_checkpoint_pack():
+    """Checkpoint tanımlarını JSON / YAML pack olarak indirir (bkz. checkpoints/packs.py)."""
+    fmt = (request.args.get('format') or 'json').lower()
+    db_type = (request.args.get('db_type') or '').lower()
+
+    if fmt not in PACK_FORMATS:
+        flash(f"Unsupported pack format: {fmt}", "danger")
+        return redirect(url_for('checkpoints.import_checkpoint_pack'))
+
+    checkpoints = catalog.for_db_type(db_type) if db_type else catalog.all()
+    try:
+        body = export_pack(checkpoints, fmt)
+    except PackError as e:
+        flash(str(e), "danger")
+        return redirect(url_for('checkpoints.import_checkpoint_pack'))
+
+    filename = secure_filename(
+        f"checkpoints_{db_type or 'all'}_{datetime.date.today():%Y%m%d}.{fmt}"
+    )
+    mimetype = "application/x-yaml" if fmt == "yaml" else "application/json"
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@checkpoints_bp.route('/import-pack', methods=['GET', 'POST'])
+@login_required
+def import_checkpoint_pack():
+    """
+    Pack yükler: "Preview" yalnızca farkları gösterir, "Import" yeni ve
+    değişen checkpoint'leri tek transaction'da yazar.
+    """
+    plan = None
+    applied = False
+
+    if request.method == 'POST':
+        upload = request.files.get('pack')
+        if not upload or not upload.filename:
+            flash("Please choose a pack file.", "danger")
+        else:
+            try:
+                entries = parse_pack(upload.read(), format_for(upload.filename))
+                plan = plan_import(entries)
+                if request.form.get('action') == 'apply':
+                    apply_import(plan)
+                    applied = True
+                    flash(
+                        f"Pack imported: {len(plan['create'])} new, "
+                        f"{len(plan['update'])} updated, {plan['unchanged']} unchanged.",
+                        "success",
+                    )
+            except PackError as e:
+                flash(str(e), "danger")
+            except Exception as e:
+                flash(f"Import failed, nothing was written: {e}", "danger")
+
+    return render_template(
+        "checkpoints/import_pack.html",
+        plan=plan,
+        applied=applied,
+        formats=available_formats(),
+        db_types=SUPPORTED_DB_TYPES,
+    )
+
+
+# =====================================================================
+# --------------------------- PROFILER -------------------------------
+# =====================================================================
+
+@checkpoints_bp.route('/profile', methods=['GET'])
+@login_required
+def profile_report():
+    """
+    Checkpoint'leri süreye göre sıralar: p50 / p95, datasource'lar arası
+    dağılım ve toplam süredeki pay (bkz. checkpoints/profile.py).
+    """
+    phase = request.args.get('phase', 'sql_test')
+    if phase not in PHASES:
+        phase = 'sql_test'
+    sort = request.args.get('sort', 'share')
+    days = request.args.get('days', PROFILE_WINDOW_DAYS, type=int) or PROFILE_WINDOW_DAYS
+
+    names = {cp["id"]: cp for cp in catalog.all()}
+    rows = rank_checkpoints(phase, days=max(1, days), sort=sort, names=names)
+
+    return render_template(
+        "checkpoints/profile.html",
+        rows=rows,
+        phase=phase,
+        phases=list(PHASES),
+        sort=sort if sort in SORT_KEYS else 'share',
+        days=days,
+        total_ms=sum(r["total_ms"] for r in rows),
+    )
+
+
+@checkpoints_bp.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    """
+    Job ilerlemesi + kısmi sonuçlar. ?since=N ile yalnızca N'den sonraki
+    sonuçlar döner (istemci bir önceki cevaptaki 'next' değerini gönderir).
+    """
+    # Başka kullanıcının job'ı da "bulunamadı" döner
+    job = job_manager.get(job_id, owner=_session_user_id())
+    if not job:
+        return jsonify({"ok": False, "message": "Job not found."}), 404
+    return jsonify(job.to_dict(since=request.args.get('since', 0, type=int)))
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoint listesi için arama ve keyset (seek) pagination.
+
+Sayfalar OFFSET yerine (Name, Id) üzerinden ilerler; her sayfa
+idx_checkpoints_name_id indeksinde doğrudan konumlanır. Arama, varsa
+ngram FULLTEXT indeksini (MATCH ... AGAINST) kullanır; indeks yoksa veya
+terim ngram boyundan kısaysa LIKE'a düşer.
+
+İndeksler liste ekranında değil uygulama açılışında ensure_indexes() ile
+kurulur; INDEX yetkisi yoksa uyarı yazılır ve arama LIKE ile çalışır.
+FULLTEXT indeksi innodb_ft_enable_stopword=OFF iken kurulur: varsayılan
+stopword listesiyle ngram parser 'a' / 'i' içeren bigram'ları indekslemez
+ve bu terimler (ör. "password") bulunamaz.
+
+Toplam sayı arama metnine göre CHECKPOINT_COUNT_TTL sn cache'lenir.
+invalidate_counts() yalnızca çağrıldığı process'in cache'ini temizler;
+birden çok worker process varsa diğerlerinde toplam en fazla TTL kadar
+eski kalabilir.
+"""
+import logging
+import threading
+
+import pymysql
+
+from cache import TTLCache
+from config import CHECKPOINT_COUNT_TTL
+from db import get_db
+
+log = logging.getLogger(__name__)
+
+
+NAME_INDEX = "CREATE INDEX idx_checkpoints_name_id ON checkpoints (Name, Id)"
+FULLTEXT_NAME = "ft_checkpoints_search_nostop"
+FULLTEXT_INDEX = (
+    f"CREATE FULLTEXT INDEX {FULLTEXT_NAME} "
+    "ON checkpoints (Name, DB_Type, Severity) WITH PARSER ngram"
+)
+
+_DUPLICATE_KEY = 1061
+_NO_FULLTEXT_INDEX = 1191
+NGRAM_TOKEN_SIZE = 2            # MySQL ngram_token_size varsayılanı
+_INDEX_CHECK_TTL = 300          # indeks sonradan kurulursa diğer process'ler de görsün
+
+_fulltext = TTLCache(maxsize=1, ttl=_INDEX_CHECK_TTL)
+_counts = TTLCache(maxsize=256, ttl=CHECKPOINT_COUNT_TTL)
+
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+
+def _create(cur, ddl):
+    try:
+        cur.execute(ddl)
+    except pymysql.err.OperationalError as e:
+        if e.args[0] != _DUPLICATE_KEY:
+            raise
+
+
+def create_indexes(cur):
+    """
+    Arama indekslerini (yoksa) kurar.
+    Hatalar (yetki, ngram desteği) uyarı olarak yazılır, kurulumu durdurmaz.
+    """
+    try:
+        _create(cur, NAME_INDEX)
+    except pymysql.err.MySQLError as e:
+        log.warning("Could not create checkpoint name index: %s", e)
+
+    try:
+        cur.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        try:
+            _create(cur, FULLTEXT_INDEX)
+        finally:
+            cur.execute("SET SESSION innodb_ft_enable_stopword = DEFAULT")
+    except pymysql.err.MySQLError as e:
+        # ngram parser / FULLTEXT desteklenmiyor ya da yetki yok: LIKE ile devam
+        log.warning("Could not create checkpoint FULLTEXT index: %s", e)
+    _fulltext.clear()
+
+
+def ensure_indexes():
+    """
+    Arama indekslerini process başına bir kez kurar; app açılışında çağrılır.
+    Repo erişilemiyorsa uyarı yazılır, bir sonraki çağrıda yeniden denenir.
+    """
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    with _indexes_lock:
+        if _indexes_ready:
+            return
+        try:
+            with get_db() as con, con.cursor() as cur:
+                create_indexes(cur)
+        except Exception as e:
+            log.warning("Checkpoint search indexes not checked: %s", e)
+            return
+        _indexes_ready = True
+
+
+def _has_fulltext(cursor):
+    """Stopword'süz FULLTEXT indeksi var mı (salt okuma, _INDEX_CHECK_TTL sn cache'li)."""
+    has = _fulltext.get(FULLTEXT_NAME)
+    if has is None:
+        try:
+            cursor.execute("SHOW INDEX FROM checkpoints WHERE Key_name = %s", (FULLTEXT_NAME,))
+            has = bool(cursor.fetchall())
+        except pymysql.err.MySQLError:
+            has = False
+        _fulltext.set(FULLTEXT_NAME, has)
+    return has
+
+
+def invalidate_counts():
+    """
+    Checkpoint eklenince / silinince cache'lenen toplamları düşürür
+    (yalnızca bu process; diğerleri TTL dolunca yeniler).
+    """
+    _counts.clear()
+
+
+def _where(search, fulltext):
+    if not search:
+        return "", []
+    term = search.replace('"', " ").strip()
+    if fulltext and len(term) >= NGRAM_TOKEN_SIZE:
+        # ngram indeksinde tırnaklı ifade, alt dizge araması gibi davranır
+        return ("MATCH(Name, DB_Type, Severity) AGAINST (%s IN BOOLEAN MODE)",
+                [f'"{term}"'])
+    like = f"%{search}%"
+    return "(Name LIKE %s OR DB_Type LIKE %s OR Severity LIKE %s)", [like, like, like]
+
+
+def _execute(cursor, build):
+    """FULLTEXT indeksi sonradan kaldırılmışsa LIKE ile bir kez daha dener."""
+    fulltext = bool(_has_fulltext(cursor))
+    try:
+        cursor.execute(*build(fulltext))
+    except pymysql.err.OperationalError as e:
+        if e.args[0] != _NO_FULLTEXT_INDEX or not fulltext:
+            raise
+        _fulltext.set(FULLTEXT_NAME, False)
+        cursor.execute(*build(False))
+
+
+def count_checkpoints(cursor, search):
+    total = _counts.get(search)
+    if total is not None:
+        return total
+
+    def build(fulltext):
+        where, params = _where(search, fulltext)
+        return (f"SELECT COUNT(*) AS cnt FROM checkpoints {'WHERE ' + where if where else ''}",
+                params)
+
+    _execute(cursor, build)
+    total = cursor.fetchone()["cnt"]
+    _counts.set(search, total)
+    return total
+
+
+def fetch_page(cursor, search, per_page, after=None, before=None):
+    """
+    (Name, Id) sırasında bir sayfa döner: (rows, has_more).
+
+    after=(name, id): bu anahtardan sonraki sayfa.
+    before=(name, id): bu anahtardan önceki sayfa (geri gitme).
+    has_more, gidilen yönde başka satır olup olmadığını söyler.
+    """
+    def build(fulltext):
+        where, params = _where(search, fulltext)
+        clauses = [where] if where else []
+        order = "Name ASC, Id ASC"
+        if after:
+            clauses.append("(Name > %s OR (Name = %s AND Id > %s))")
+            params += [after[0], after[0], after[1]]
+        elif before:
+            clauses.append("(Name < %s OR (Name = %s AND Id < %s))")
+            params += [before[0], before[0], before[1]]
+            order = "Name DESC, Id DESC"
+        where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return (
+            f"""
+            SELECT
+                Id AS id,
+                Name AS name,
+                DB_Type AS db_type,
+                Severity AS severity
+            FROM checkpoints
+            {where_sql}
+            ORDER BY {order}
+            LIMIT %s
+            """,
+            params + [per_page + 1],
+        )
+
+    _execute(cursor, build)
+    rows = list(cursor.fetchall())
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before:
+        rows.reverse()
+    return rows, has_more
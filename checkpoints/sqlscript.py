@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Pre SQL script'lerini lehçeye göre ifadelere / batch'lere bölüp çalıştırır.
+
+Oracle: ';' ve tek başına satırdaki '/' ifade sonudur; DECLARE / BEGIN /
+CREATE PROCEDURE vb. PL/SQL bloklarında ve WITH FUNCTION / PROCEDURE ile
+başlayan sorgularda ';' bölmez, ifade '/' ile (ya da script sonunda) biter.
+İfadeler sırayla ayrı execute ile çalışır; tek bir anonim bloğa
+(EXECUTE IMMEDIATE) sarılmaz, çünkü statik PL/SQL blok derlenirken önceki
+ALTER SESSION SET CURRENT_SCHEMA henüz uygulanmamış olur.
+
+T-SQL: script tek başına satırdaki GO ile batch'lere ayrılır (GO n batch'i
+n kez çalıştırır); her batch tek execute'tur, ara sonuçlar nextset ile boşaltılır.
+
+Her iki lehçede string literal ('..', q'[..]', N'..'), tırnaklı isimler
+("..", [..]) ve yorumlar (--, /* */) içindeki ayraçlar dikkate alınmaz.
+Script metni başına bir kez parse edilir (compile_script lru_cache'li).
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+
+ORACLE = "oracle"
+MSSQL = "mssql"
+
+# statements: sırayla execute edilecek SQL'ler
+Script = namedtuple("Script", "statements")
+
+_PLSQL_START = re.compile(
+    r"(?:declare|begin"
+    r"|create\s+(?:or\s+replace\s+)?(?:(?:non)?editionable\s+)?"
+    r"(?:function|procedure|package|trigger|type|library|java))\b",
+    re.IGNORECASE,
+)
+# 12c+ WITH FUNCTION / PROCEDURE: içi PL/SQL, sonu SQL sorgusu
+_INLINE_PLSQL_START = re.compile(r"with\s+(?:function|procedure)\b", re.IGNORECASE)
+
+# split_oracle ifade türleri
+_SQL, _PLSQL, _INLINE_PLSQL = "sql", "plsql", "inline"
+_GO = re.compile(r"go(?:[ \t]+(\d+))?[ \t]*(?:--[^\n]*)?(?=\r?\n|$)", re.IGNORECASE)
+_Q_CLOSE = {"[": "]", "{": "}", "(": ")", "<": ">"}
+
+
+def _is_ident(ch):
+    return ch.isalnum() or ch in "_$#"
+
+
+def _skip_quoted(text, i, close):
+    """text[i] açılış tırnağı; kapanıştan sonraki index (çift kapanış kaçıştır)."""
+    n = len(text)
+    i += 1
+    while i < n:
+        if text[i] == close:
+            if i + 1 < n and text[i + 1] == close:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_line(text, i):
+    end = text.find("\n", i)
+    return len(text) if end < 0 else end
+
+
+def _skip_block_comment(text, i, nested=False):
+    """text[i:i+2] == '/*'. T-SQL block yorumları iç içe olabilir."""
+    if not nested:
+        end = text.find("*/", i + 2)
+        return len(text) if end < 0 else end + 2
+    n = len(text)
+    depth = 0
+    while i < n:
+        if text.startswith("/*", i):
+            depth += 1
+            i += 2
+        elif text.startswith("*/", i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return n
+
+
+def _q_quote_at(text, i):
+    """Oracle q'<d>...<d>' literal'ı i'de başlıyorsa (N öneki dahil) sonunu döner."""
+    j = i + 1 if text[i] in "nN" else i
+    if not (text[j:j + 1] in ("q", "Q") and text[j + 1:j + 2] == "'" and j + 2 < len(text)):
+        return None
+    if i > 0 and _is_ident(text[i - 1]):
+        return None
+    opener = text[j + 2]
+    end = text.find(_Q_CLOSE.get(opener, opener) + "'", j + 3)
+    return len(text) if end < 0 else end + 2
+
+
+def _slash_line(text, i):
+    """Satır başındaki '/' tek başınaysa satır sonunun index'i, değilse None."""
+    end = _skip_line(text, i + 1)
+    return end if not text[i + 1:end].strip() else None
+
+
+# ---------- Oracle ---------- #
+
+def split_oracle(text):
+    """
+    Oracle script'ini ifadelere böler; PL/SQL bloklarının sonundaki ';'
+    korunur (END; gerekli), SQL ifadelerininki atılır.
+    """
+    statements = []
+    n = len(text)
+    i = start = 0
+    kind = None             # None: ifadede henüz kod yok
+    line_start = True
+
+    def emit(end):
+        # Baştaki yorumlar atılır
+        if kind is not None:
+            stmt = text[start:end].strip()
+            if kind != _PLSQL:
+                stmt = stmt.rstrip(";").rstrip()
+            if stmt:            # tek başına ';' boş ifade değildir
+                statements.append(stmt)
+
+    while i < n:
+        c = text[i]
+        if c == "\n":
+            line_start = True
+            i += 1
+            continue
+        if c in " \t\r":
+            i += 1
+            continue
+
+        if line_start and c == "/":
+            end = _slash_line(text, i)
+            if end is not None:
+                emit(i)
+                i = start = end
+                kind = None
+                continue
+        line_start = False
+
+        if text.startswith("--", i):
+            i = _skip_line(text, i)
+            continue
+        if text.startswith("/*", i):
+            i = _skip_block_comment(text, i)
+            continue
+
+        if kind is None:
+            if _PLSQL_START.match(text, i):
+                kind = _PLSQL
+            elif _INLINE_PLSQL_START.match(text, i):
+                kind = _INLINE_PLSQL
+            else:
+                kind = _SQL
+            start = i
+
+        q_end = _q_quote_at(text, i) if c in "nNqQ" else None
+        if q_end is not None:
+            i = q_end
+        elif c == "'" or c == '"':
+            i = _skip_quoted(text, i, c)
+        elif c == ";" and kind == _SQL:
+            emit(i)
+            i = start = i + 1
+            kind = None
+        else:
+            i += 1
+
+    emit(n)
+    return statements
+
+
+# ---------- T-SQL ---------- #
+
+def split_tsql(text):
+    """T-SQL script'ini GO satırlarından batch'lere böler."""
+    batches = []
+    n = len(text)
+    i = start = 0
+    has_code = False
+    line_start = True
+
+    while i < n:
+        c = text[i]
+        if c == "\n":
+            line_start = True
+            i += 1
+            continue
+        if c in " \t\r":
+            i += 1
+            continue
+
+        if line_start and c in "gG":
+            m = _GO.match(text, i)
+            if m:
+                if has_code:
+                    batches.extend([text[start:i].strip()] * int(m.group(1) or 1))
+                i = start = m.end()
+                has_code = False
+                continue
+        line_start = False
+
+        if text.startswith("--", i):
+            i = _skip_line(text, i)
+            continue
+        if text.startswith("/*", i):
+            i = _skip_block_comment(text, i, nested=True)
+            continue
+
+        has_code = True
+        if c == "'" or c == '"':
+            i = _skip_quoted(text, i, c)
+        elif c == "[":
+            i = _skip_quoted(text, i, "]")
+        else:
+            i += 1
+
+    if has_code:
+        batches.append(text[start:].strip())
+    return batches
+
+
+# ---------- API ---------- #
+
+@lru_cache(maxsize=1024)
+def compile_script(text, dialect):
+    """
+    Script'i sırayla çalıştırılacak SQL listesine çevirir: T-SQL'de her GO
+    batch'i, Oracle'da (ve bilinmeyen lehçede) her ifade bir execute'tur.
+    """
+    dialect = (dialect or "").lower()
+    if dialect == MSSQL:
+        return Script(tuple(split_tsql(text)))
+    return Script(tuple(split_oracle(text)))
+
+
+def _drain(cur):
+    """Batch'teki sonraki result set / row count'ları tüketir; hatalar burada yükselir."""
+    nextset = getattr(cur, "nextset", None)
+    if nextset is None:
+        return
+    while nextset():
+        pass
+
+
+def run_script(conn, cur, text, dialect):
+    """İfadeleri aynı cursor'da sırayla çalıştırır ve sonda commit eder."""
+    mssql = (dialect or "").lower() == MSSQL
+    for sql in compile_script(text, dialect).statements:
+        cur.execute(sql)
+        if mssql:
+            _drain(cur)
+    conn.commit()
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Scan sonuçlarının repo veritabanında saklanması (scan_runs / scan_results).
+
+Sonuçlar tek tek INSERT edilmez; ScanResultWriter bellekte biriktirip
+SCAN_RESULT_BATCH'lik executemany ile yazar.
+"""
+import datetime
+import json
+import threading
+
+from config import SCAN_RESULT_BATCH
+from db import get_db
+
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS scan_runs (
+        run_id       BIGINT AUTO_INCREMENT PRIMARY KEY,
+        kind         VARCHAR(20)  NOT NULL,
+        started_by   VARCHAR(100) NULL,
+        status       VARCHAR(20)  NOT NULL,
+        total        INT          NOT NULL DEFAULT 0,
+        summary      TEXT         NULL,
+        started_at   DATETIME(3)  NOT NULL,
+        finished_at  DATETIME(3)  NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scan_results (
+        result_id      BIGINT AUTO_INCREMENT PRIMARY KEY,
+        run_id         BIGINT        NOT NULL,
+        checkpoint_id  INT           NOT NULL,
+        ds_id          INT           NOT NULL,
+        status         VARCHAR(20)   NOT NULL,
+        result_value   TEXT          NULL,
+        condition_expr TEXT          NULL,
+        error          TEXT          NULL,
+        duration_ms    DECIMAL(12,2) NULL,
+        fingerprint    CHAR(64)      NULL,
+        carried_forward TINYINT(1)   NOT NULL DEFAULT 0,
+        batched        TINYINT(1)    NOT NULL DEFAULT 0,
+        executed_at    DATETIME(3)   NOT NULL,
+        KEY idx_scan_results_run (run_id),
+        KEY idx_scan_results_cp_ds (checkpoint_id, ds_id, executed_at),
+        KEY idx_scan_results_last (ds_id, checkpoint_id, result_id),
+        KEY idx_scan_results_time (executed_at)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS detail_stats (
+        stat_id        BIGINT AUTO_INCREMENT PRIMARY KEY,
+        checkpoint_id  INT           NOT NULL,
+        ds_id          INT           NOT NULL,
+        duration_ms    DECIMAL(12,2) NOT NULL,
+        row_count      INT           NOT NULL,
+        complete       TINYINT(1)    NOT NULL DEFAULT 1,
+        executed_at    DATETIME(3)   NOT NULL,
+        KEY idx_detail_stats_time (executed_at),
+        KEY idx_detail_stats_cp (checkpoint_id, ds_id)
+    )
+    """,
+)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def ensure_schema():
+    """Tabloları (yoksa) process başına bir kez oluşturur."""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with get_db() as con, con.cursor() as cur:
+            for ddl in SCHEMA:
+                cur.execute(ddl)
+        _schema_ready = True
+
+
+def _now():
+    return datetime.datetime.now()
+
+
+def _text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def create_run(kind, started_by=None, total=0):
+    ensure_schema()
+    with get_db() as con, con.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO scan_runs (kind, started_by, status, total, started_at)
+            VALUES (%s, %s, 'running', %s, %s)
+            """,
+            (kind, started_by, total, _now()),
+        )
+        return cur.lastrowid
+
+
+def finish_run(run_id, status, summary=None):
+    with get_db() as con, con.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE scan_runs
+               SET status=%s, summary=%s, finished_at=%s
+             WHERE run_id=%s
+            """,
+            (status, json.dumps(summary or {}), _now(), run_id),
+        )
+
+
+class ScanResultWriter:
+    """
+    Bir scan_run'ın sonuçlarını batch'ler halinde yazar (thread-safe).
+
+        writer = ScanResultWriter(run_id)
+        writer.add(ds, result)      # engine.run_test() çıktısı
+        writer.close("done")
+    """
+
+    INSERT_SQL = """
+        INSERT INTO scan_results (
+            run_id, checkpoint_id, ds_id, status,
+            result_value, condition_expr, error,
+            duration_ms, fingerprint, carried_forward, batched, executed_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+
+    def __init__(self, run_id, batch_size=SCAN_RESULT_BATCH):
+        self.run_id = run_id
+        self.batch_size = batch_size
+        self.summary = {}
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add(self, ds, result):
+        row = (
+            self.run_id,
+            result.get("checkpoint_id"),
+            ds.get("id") if ds.get("id") is not None else ds.get("ds_id"),
+            result.get("status"),
+            _text(result.get("result_value")),
+            result.get("condition_expr"),
+            result.get("error"),
+            result.get("duration_ms"),
+            result.get("fingerprint"),
+            1 if result.get("carried_forward") else 0,
+            1 if result.get("batched") else 0,
+            result.get("executed_at") or _now(),
+        )
+        with self._lock:
+            self._buffer.append(row)
+            status = result.get("status")
+            self.summary[status] = self.summary.get(status, 0) + 1
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        # Yazma sırası korunsun ve aynı anda tek flush olsun
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            with get_db() as con, con.cursor() as cur:
+                cur.executemany(self.INSERT_SQL, rows)
+
+    def close(self, status="done"):
+        self.flush()
+        finish_run(self.run_id, status, self.summary)
+
+
+def load_last_results(ds_ids):
+    """
+    Verilen datasource'lar için her (checkpoint_id, ds_id) çiftinin en son
+    sonucunu döner: {(checkpoint_id, ds_id): row}.
+    """
+    if not ds_ids:
+        return {}
+    ensure_schema()
+    with get_db() as con, con.cursor() as cur:
+        cur.execute(
+            """
+            SELECT r.checkpoint_id, r.ds_id, r.status, r.result_value,
+                   r.condition_expr, r.error, r.duration_ms,
+                   r.fingerprint, r.executed_at
+              FROM scan_results r
+              JOIN (
+                    SELECT checkpoint_id, ds_id, MAX(result_id) AS result_id
+                      FROM scan_results
+                     WHERE ds_id IN %s
+                     GROUP BY checkpoint_id, ds_id
+                   ) last ON last.result_id = r.result_id
+            """,
+            (tuple(ds_ids),),
+        )
+        return {(r["checkpoint_id"], r["ds_id"]): r for r in cur.fetchall()}
+
+
+def record_detail_stat(checkpoint_id, ds_id, duration_ms, row_count, complete=True):
+    """
+    SQL Detail çalıştırmasının süresini ve okunan satır sayısını yazar
+    (profiler raporu için). Hata ekranı bozmasın diye yutulur.
+    """
+    try:
+        ensure_schema()
+        with get_db() as con, con.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO detail_stats (
+                    checkpoint_id, ds_id, duration_ms, row_count, complete, executed_at
+                ) VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                (checkpoint_id, ds_id, round(duration_ms, 2), row_count,
+                 1 if complete else 0, _now()),
+            )
+    except Exception:
+        pass
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Sürücü zaman aşımına ek güvence: süresi dolan çağrıyı cancel() ile keser.
+
+Oracle call_timeout / pyodbc timeout normalde sorguyu kendisi durdurur;
+watchdog yalnızca onlar tetiklenmezse (grace sonrası) devreye girer.
+Tüm izlemeler tek bir daemon thread'den yürür, çağrı başına thread açılmaz.
+
+    with watchdog.watch(60, cancel_fn) as guard:
+        cur.execute(sql)
+    if guard.fired: ...
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from config import WATCHDOG_GRACE_SECONDS
+
+
+class _Guard:
+    __slots__ = ("fired", "done")
+
+    def __init__(self):
+        self.fired = False
+        self.done = False
+
+
+class Watchdog:
+
+    def __init__(self, grace=WATCHDOG_GRACE_SECONDS):
+        self.grace = grace
+        self._heap = []             # (deadline, seq, guard, cancel)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="query-watchdog", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                deadline, _, guard, cancel = self._heap[0]
+                wait = deadline - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._heap)
+                if guard.done:
+                    continue
+                guard.fired = True
+            try:
+                cancel()
+            except Exception:
+                pass
+
+    @contextmanager
+    def watch(self, seconds, cancel):
+        """seconds None / 0 ise izlemez."""
+        guard = _Guard()
+        if not seconds or cancel is None:
+            yield guard
+            return
+        with self._cond:
+            self._start()
+            heapq.heappush(self._heap, (time.monotonic() + seconds + self.grace,
+                                        next(self._seq), guard, cancel))
+            self._cond.notify()
+        try:
+            yield guard
+        finally:
+            # Heap'ten silmek yerine işaretlenir; süresi gelince atlanır
+            guard.done = True
+
+
+watchdog = Watchdog()
@@ -1,11 +1,107 @@
 # -*- coding: utf-8 -*-
 # Basit config: istersen .env kullanabilirsin
+import os
+import tempfile
 
 SECRET_KEY = "change-this-secret-in-prod"
 
 DB_CFG = {
-    "host": "127.0.0.1",
-    "user": "app_user",        # gerekirse 'root'
-    "password": "app_user",
-    "database": "repo",
+    "host": os.getenv("MYSQL_HOST", "127.0.0.1"),
+    "port": int(os.getenv("MYSQL_PORT", "3306")),
+    "user": os.getenv("MYSQL_USER", "app_user"),        # gerekirse 'root'
+    "password": os.getenv("MYSQL_PASSWORD", "app_user"),
+    "database": os.getenv("MYSQL_DB", "repo"),
 }
+
+# Repo (MySQL) connection pool
+DB_POOL_SIZE = 10                # en fazla açık bağlantı
+DB_POOL_TIMEOUT = 10             # havuz doluysa checkout için bekleme (saniye)
+DB_POOL_IDLE_TIMEOUT = 300       # bu süreden uzun boşta kalan bağlantı kapatılır
+DB_POOL_PING_INTERVAL = 10       # bu süreden uzun boşta kalmışsa checkout'ta ping at
+
+# Fleet scan: aynı anda en fazla kaç datasource taransın
+FLEET_MAX_WORKERS = 8
+# Aynı host üzerindeki instance'lara aynı anda en fazla kaç bağlantı
+FLEET_MAX_PER_HOST = 2
+
+# Arka plan işleri (scan job'ları)
+JOB_MAX_WORKERS = 4
+# run-test / run-sql-detail gibi tek checkpoint'lik işler için ayrı worker'lar
+JOB_QUICK_WORKERS = 8
+# Biten job'lar bellekte ne kadar tutulsun (saniye)
+JOB_RETENTION_SECONDS = 3600
+# Bellekte tutulan biten job sayısı ve job başına saklanan en fazla sonuç
+JOB_MAX_RETAINED = 200
+JOB_MAX_RESULTS = 50000
+
+# Hedef veritabanı (Oracle / MSSQL) connection pool – ds_id bazında
+TARGET_POOL_MAX_PER_DS = 4       # bir datasource için en fazla açık bağlantı
+TARGET_POOL_TIMEOUT = 30         # havuz doluysa bekleme (saniye)
+TARGET_POOL_IDLE_TIMEOUT = 300   # boşta kalan bağlantı bu süreden sonra kapatılır
+TARGET_POOL_PING_INTERVAL = 30   # bu süreden uzun boşta kalmışsa checkout'ta doğrula
+
+# SQL Detail: fetchmany ile bir seferde çekilecek satır sayısı
+DETAIL_FETCH_BATCH = 1000
+# Detail ekranı: sayfa başına satır, toplam satır limiti, açık cursor ömrü
+DETAIL_PAGE_SIZE = 200
+DETAIL_MAX_ROWS = 20000
+DETAIL_CURSOR_TTL = 300
+DETAIL_CURSOR_MAX = 20           # aynı anda açık tutulabilecek detail cursor sayısı
+# Bir datasource'ta açık kalabilecek detail cursor'ı; havuzun (TARGET_POOL_MAX_PER_DS)
+# en az bir bağlantısı scan / run-test için boş kalsın
+DETAIL_CURSOR_MAX_PER_DS = max(1, TARGET_POOL_MAX_PER_DS // 2)
+
+# Scan sonuçları repo'ya kaç satırlık executemany batch'leri ile yazılsın
+SCAN_RESULT_BATCH = 500
+
+# Incremental scan: bu süreden eski sonuçlar değişmemiş olsa da yeniden çalıştırılır
+INCREMENTAL_TTL_HOURS = 24
+
+# Run-test sonuç cache'i: (checkpoint, datasource, SQL hash) -> sonuç
+RESULT_CACHE_TTL = 300
+RESULT_CACHE_SIZE = 1000
+
+# Toplu taramada tek SELECT'te birleştirilecek skaler SQL_Test sayısı (0 = kapalı)
+SCAN_BATCH_SIZE = 50
+
+# Checkpoint listesi: sayfa boyutu ve arama başına cache'lenen toplam sayı
+CHECKPOINT_PAGE_SIZE = 15
+CHECKPOINT_COUNT_TTL = 60
+
+# Process içi checkpoint kataloğu: repo'daki versiyon sayacına en fazla bu sıklıkla bakılır (sn)
+CATALOG_CHECK_INTERVAL = 5
+
+# versions tablosu (login / ana sayfa banner'ı) bu kadar saniye cache'lenir
+VERSIONS_TTL = 300
+
+# /metrics: login olmuş kullanıcıya ya da (tanımlıysa) "Authorization: Bearer <token>"
+# gönderen scraper'a açık; ikisi de yoksa 401
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Profiler raporu: varsayılan zaman penceresi (gün)
+PROFILE_WINDOW_DAYS = 7
+
+# Zaman aşımları (sn, 0 = sınırsız): hedef login, checkpoint başına SQL,
+# SQL Detail ve bir scan / fleet scan'in toplam süresi
+CONNECT_TIMEOUT_SECONDS = 15
+CHECK_TIMEOUT_SECONDS = 60
+DETAIL_TIMEOUT_SECONDS = 300
+SCAN_DEADLINE_SECONDS = 3600
+# Sürücü zaman aşımı tetiklenmezse watchdog bu kadar sonra cancel() çağırır
+WATCHDOG_GRACE_SECONDS = 5
+
+# Datasource listesi "Check all": aynı anda en fazla bu kadar TCP denemesi,
+# host başına bekleme süresi (sn)
+REACHABILITY_CONCURRENCY = 64
+REACHABILITY_TIMEOUT = 3
+
+# Datasource health monitor: TCP + login kontrolü arka planda bu aralıkla (sn)
+# tekrarlanır; her tur ±HEALTH_JITTER oranında kaydırılır. HEALTH_MONITOR=0 kapatır.
+HEALTH_MONITOR_ENABLED = os.environ.get("HEALTH_MONITOR", "1") != "0"
+HEALTH_INTERVAL = 120
+HEALTH_JITTER = 0.2
+HEALTH_MAX_WORKERS = 8
+# Login probe'u için ayrı bağlantının connect / sorgu timeout'u (sn)
+HEALTH_LOGIN_TIMEOUT = 5
+# Birden çok worker process'te monitor'ü yalnızca bu kilidi alan process çalıştırır
+HEALTH_LOCK_FILE = os.environ.get("HEALTH_LOCK_FILE", os.path.join(tempfile.gettempdir(), "dbscan-health.lock"))
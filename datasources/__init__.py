@@ -1,25 +1,25 @@
 # -*- coding: utf-8 -*-
 from flask import (
     Blueprint, render_template, request, redirect, url_for,
-    flash, jsonify, session
+    flash, jsonify, session, Response, stream_with_context
 )
-import pymysql
-import os
+import json
 import socket
+import time
+
+from db import get_db
+from checkpoints.pool import target_pool
+from checkpoints.result_cache import invalidate_datasource
+from .registry import registry
+from .reachability import sweep, describe_error
+from .health import monitor, check_oracle, check_sqlserver, UP, LOGIN_FAILED
 
 datasources_bp = Blueprint("datasources", __name__, url_prefix="/datasources")
 
 # ---------------------- MySQL repo connection ----------------------
-def get_repo_conn():
-    return pymysql.connect(
-        host=os.getenv("MYSQL_HOST", "127.0.0.1"),
-        port=int(os.getenv("MYSQL_PORT", "3306")),
-        user=os.getenv("MYSQL_USER", "app_user"),
-        password=os.getenv("MYSQL_PASSWORD", "app_user"),
-        database=os.getenv("MYSQL_DB", "repo"),
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=True,
-    )
+# db.get_db() ile aynı havuzu kullanır; `with get_repo_conn() as con` bağlantıyı
+# kapatmaz, havuza iade eder.
+get_repo_conn = get_db
 
 
 ALLOWED_DB_TYPES = {"oracle", "mssql", "postgres", "mysql"}
@@ -50,7 +50,8 @@ def list_datasources():
         cur.execute(sql)
         rows = cur.fetchall()
 
-    return render_template("datasources/list.html", rows=rows)
+    # Sağlık durumu arka plandaki monitor'dan; burada probe yapılmaz
+    return render_template("datasources/list.html", rows=rows, health=monitor.snapshot())
 
 
 # ---------------------- NEW ----------------------
@@ -114,6 +115,7 @@ def new_datasource():
             with get_repo_conn() as con, con.cursor() as cur:
                 cur.execute(sql, params)
                 new_id = cur.lastrowid
+            registry.bump()
 
             flash("Datasource saved.", "success")
             # Liste yerine direkt edit formuna dön
@@ -205,6 +207,12 @@ def edit_datasource(ds_id):
                         (new_pwd, ds_id),
                     )
 
+            # Havuzdaki eski bağlantılar yeni ayarlarla uyuşmayabilir
+            registry.bump()
+            target_pool.invalidate(ds_id)
+            invalidate_datasource(ds_id)
+            monitor.forget(ds_id)
+
             flash("Datasource saved.", "success")
             # Liste yerine aynı formda kal
             return redirect(url_for("datasources.edit_datasource", ds_id=ds_id))
@@ -226,6 +234,10 @@ def delete_datasource(ds_id):
 
     with get_repo_conn() as con, con.cursor() as cur:
         cur.execute("DELETE FROM datasources WHERE ds_id=%s", (ds_id,))
+    registry.bump()
+    target_pool.invalidate(ds_id)
+    invalidate_datasource(ds_id)
+    monitor.forget(ds_id)
 
     flash("Datasource deleted.", "success")
     return redirect(url_for("datasources.list_datasources"))
@@ -241,9 +253,7 @@ def check_datasource(ds_id):
             return jsonify({"ok": False, "message": "Login required"}), 401
         return rl
 
-    with get_repo_conn() as con, con.cursor() as cur:
-        cur.execute("SELECT * FROM datasources WHERE ds_id=%s", (ds_id,))
-        ds = cur.fetchone()
+    ds = registry.get(ds_id)
 
     if not ds:
         return jsonify({"ok": False, "message": "Datasource not found."}), 404
@@ -262,87 +272,44 @@ def _do_check(ds: dict) -> str:
     user = ds.get("username")
     pwd = ds.get("password")
 
-    if db_type == "oracle":
-        _check_oracle(
-            host,
-            port or 1521,
-            user,
-            pwd,
-            ds.get("oracle_service_name"),
-            ds.get("oracle_sid"),
-        )
-        return "Oracle connection OK"
-
-    elif db_type == "mssql":
-        _check_sqlserver(
-            host,
-            port or 1433,
-            user,
-            pwd,
-            ds.get("domain"),
-            ds.get("auth_mode"),
-        )
-        return "SQL Server connection OK"
-
-    elif db_type in {"postgres", "mysql"}:
-        return f"{db_type} is not yet supported by 'Check' button."
-
-    else:
-        raise RuntimeError(f"Unsupported db_type: {db_type}")
-
-
-def _check_oracle(host, port, user, pwd, service_name, sid):
-    import oracledb
-
-    # DSN oluşturma (service_name veya SID'e göre)
-    if service_name:
-        dsn = oracledb.makedsn(host=host, port=port, service_name=service_name)
-    elif sid:
-        dsn = oracledb.makedsn(host=host, port=port, sid=sid)
-    else:
-        raise RuntimeError("Oracle requires service_name or SID.")
-
-    # NOT: oracledb.connect() fonksiyonunda 'timeout' parametresi yok
-    conn = oracledb.connect(user=user, password=pwd, dsn=dsn)
-    cur = conn.cursor()
-    cur.execute("select 1 from dual")
-    cur.fetchone()
-    cur.close()
-    conn.close()
-
-
-def _check_sqlserver(host, port, user, pwd, domain=None, auth_mode="sql"):
-    import pyodbc
-
-    server = f"{host},{port}" if port else host
-    if (auth_mode or "sql").lower() == "windows":
-        uid = f"{domain}\\{user}" if domain else user
-        conn_str = (
-            "DRIVER={ODBC Driver 18 for SQL Server};"
-            f"SERVER={server};"
-            "Encrypt=Yes;"
-            "TrustServerCertificate=Yes;"
-            "Connection Timeout=5;"
-            f"UID={uid};"
-            "DATABASE=master;"
-        )
-    else:
-        conn_str = (
-            "DRIVER={ODBC Driver 18 for SQL Server};"
-            f"SERVER={server};"
-            "Encrypt=Yes;"
-            "TrustServerCertificate=Yes;"
-            "Connection Timeout=5;"
-            f"UID={user};PWD={pwd};"
-            "DATABASE=master;"
-        )
-
-    conn = pyodbc.connect(conn_str, timeout=5)
-    cur = conn.cursor()
-    cur.execute("SELECT 1")
-    cur.fetchone()
-    cur.close()
-    conn.close()
+    # Check butonu havuzu kullanmaz: her seferinde gerçek login denenir.
+    # Sonuç liste ekranındaki sağlık durumunu da günceller.
+    started = time.perf_counter()
+    try:
+        if db_type == "oracle":
+            check_oracle(
+                host,
+                port or 1521,
+                user,
+                pwd,
+                ds.get("oracle_service_name"),
+                ds.get("oracle_sid"),
+            )
+            msg = "Oracle connection OK"
+
+        elif db_type == "mssql":
+            check_sqlserver(
+                host,
+                port or 1433,
+                user,
+                pwd,
+                ds.get("domain"),
+                ds.get("auth_mode"),
+            )
+            msg = "SQL Server connection OK"
+
+        elif db_type in {"postgres", "mysql"}:
+            return f"{db_type} is not yet supported by 'Check' button."
+
+        else:
+            raise RuntimeError(f"Unsupported db_type: {db_type}")
+    except Exception as e:
+        if db_type in {"oracle", "mssql"}:
+            monitor.record(ds["id"], LOGIN_FAILED, error=str(e))
+        raise
+
+    monitor.record(ds["id"], UP, login_ms=round((time.perf_counter() - started) * 1000, 1))
+    return msg
 
 
 @datasources_bp.route("/<int:ds_id>/test-port", methods=["POST"])
@@ -354,9 +321,7 @@ def test_port(ds_id):
             return jsonify({"ok": False, "message": "Login required"}), 401
         return rl
 
-    with get_repo_conn() as con, con.cursor() as cur:
-        cur.execute("SELECT * FROM datasources WHERE ds_id=%s", (ds_id,))
-        ds = cur.fetchone()
+    ds = registry.get(ds_id)
 
     if not ds:
         return jsonify({"ok": False, "message": "Datasource not found."}), 404
@@ -381,13 +346,28 @@ def _socket_test_port(ds: dict) -> str:
     try:
         with socket.create_connection((host, port), timeout=3):
             return f"{host}:{port} is reachable over TCP."
-    except socket.timeout:
-        raise RuntimeError(
-            "Connection timed out. Host or network may be unreachable, or a firewall is dropping packets."
-        )
-    except ConnectionRefusedError:
-        raise RuntimeError(
-            "Connection refused. Host is reachable but the port is closed or no service is listening."
-        )
     except OSError as e:
-        raise RuntimeError(f"Socket error while connecting to {host}:{port}: {e}")
+        raise RuntimeError(describe_error(e, host, port))
+
+
+# ---------------------- REACHABILITY (all datasources) ----------------------
+@datasources_bp.route("/reachability", methods=["POST"])
+def reachability():
+    """
+    Tüm datasource'lara paralel TCP denemesi; sonuçlar tamamlandıkça
+    NDJSON (satır başına bir JSON) olarak stream edilir.
+    """
+    rl = require_login()
+    if rl:
+        if request.headers.get("X-Requested-With") == "fetch":
+            return jsonify({"ok": False, "message": "Login required"}), 401
+        return rl
+
+    targets = registry.all()
+
+    def generate():
+        for result in sweep(targets):
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Arka planda datasource sağlık kontrolü.
+
+Her turda tüm datasource'lara önce TCP denemesi (reachability.sweep), port
+açık olanlara da login + `select 1` yapılır. Sonuç ds_id bazında repo'daki
+datasource_health tablosuna yazılır; liste ekranı senkron probe yapmadan
+buradan okur, böylece monitor'ın çalışmadığı worker process'ler de aynı
+durumu gösterir. Turlar HEALTH_INTERVAL ± HEALTH_JITTER aralıkla döner ki
+çok sayıda process / host aynı anda hedeflere yüklenmesin.
+
+Login kontrolü target_pool'u kullanmaz: her probe kısa timeout'lu ayrı bir
+bağlantı açıp kapatır (havuzdaki session'ları canlı tutmasın). Login'i
+başarısız olan datasource için arka planda tekrar login denenmez (Oracle
+FAILED_LOGIN_ATTEMPTS / AD kilit politikaları hesabı kilitlemesin); yalnızca
+TCP kontrol edilir. Datasource düzenlenince ya da Check butonu başarılı
+olunca login probe'ları yeniden başlar. Birden çok worker process
+çalışıyorsa monitor yalnızca HEALTH_LOCK_FILE kilidini alan process'te döner.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config import (
+    HEALTH_INTERVAL,
+    HEALTH_JITTER,
+    HEALTH_MAX_WORKERS,
+    HEALTH_LOGIN_TIMEOUT,
+    HEALTH_LOCK_FILE,
+)
+from checkpoints.engine import SUPPORTED_DB_TYPES
+from db import get_db
+from .reachability import sweep
+from .registry import registry
+
+log = logging.getLogger(__name__)
+
+# status değerleri
+UP = "up"                   # port açık, login başarılı
+DOWN = "down"               # TCP bağlantısı kurulamadı
+LOGIN_FAILED = "login_failed"
+REACHABLE = "reachable"     # login kontrolü desteklenmeyen db_type, yalnızca TCP
+
+HEALTH_DDL = """
+    CREATE TABLE IF NOT EXISTS datasource_health (
+        ds_id         INT          PRIMARY KEY,
+        status        VARCHAR(20)  NOT NULL,
+        tcp_ms        DECIMAL(10,1) NULL,
+        login_ms      DECIMAL(10,1) NULL,
+        error         TEXT         NULL,
+        login_failed  TINYINT(1)   NOT NULL DEFAULT 0,
+        checked_at    DATETIME(3)  NOT NULL
+    )
+"""
+
+# login_failed: son login denemesi başarısız; UP yazılana (Check) ya da satır
+# silinene (edit) kadar DOWN / REACHABLE kayıtlarında da korunur.
+_UPSERT = """
+    INSERT INTO datasource_health
+        (ds_id, status, tcp_ms, login_ms, error, login_failed, checked_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        status = VALUES(status),
+        tcp_ms = VALUES(tcp_ms),
+        login_ms = VALUES(login_ms),
+        error = VALUES(error),
+        login_failed = IF(VALUES(status) = 'up', 0, GREATEST(login_failed, VALUES(login_failed))),
+        checked_at = VALUES(checked_at)
+"""
+
+
+def check_oracle(host, port, user, pwd, service_name, sid, timeout=5):
+    import oracledb
+
+    # DSN oluşturma (service_name veya SID'e göre)
+    if service_name:
+        dsn = oracledb.makedsn(host=host, port=port, service_name=service_name)
+    elif sid:
+        dsn = oracledb.makedsn(host=host, port=port, sid=sid)
+    else:
+        raise RuntimeError("Oracle requires service_name or SID.")
+
+    conn = oracledb.connect(user=user, password=pwd, dsn=dsn, tcp_connect_timeout=timeout)
+    try:
+        conn.call_timeout = int(timeout * 1000)
+        cur = conn.cursor()
+        cur.execute("select 1 from dual")
+        cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+
+
+def check_sqlserver(host, port, user, pwd, domain=None, auth_mode="sql", timeout=5):
+    import pyodbc
+
+    server = f"{host},{port}" if port else host
+    if (auth_mode or "sql").lower() == "windows":
+        uid = f"{domain}\\{user}" if domain else user
+        conn_str = (
+            "DRIVER={ODBC Driver 18 for SQL Server};"
+            f"SERVER={server};"
+            "Encrypt=Yes;"
+            "TrustServerCertificate=Yes;"
+            f"Connection Timeout={timeout};"
+            f"UID={uid};"
+            "DATABASE=master;"
+        )
+    else:
+        conn_str = (
+            "DRIVER={ODBC Driver 18 for SQL Server};"
+            f"SERVER={server};"
+            "Encrypt=Yes;"
+            "TrustServerCertificate=Yes;"
+            f"Connection Timeout={timeout};"
+            f"UID={user};PWD={pwd};"
+            "DATABASE=master;"
+        )
+
+    conn = pyodbc.connect(conn_str, timeout=timeout)
+    try:
+        conn.timeout = timeout
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+
+
+def login_check(ds, timeout=HEALTH_LOGIN_TIMEOUT):
+    """Ayrı bir bağlantıyla login + `select 1`; bağlantı her durumda kapatılır."""
+    db_type = (ds.get("db_type") or "").lower()
+    port = int(ds.get("port") or 0)
+    if db_type == "oracle":
+        check_oracle(ds.get("host"), port or 1521, ds.get("username"), ds.get("password"),
+                     ds.get("oracle_service_name"), ds.get("oracle_sid"), timeout=timeout)
+    elif db_type == "mssql":
+        check_sqlserver(ds.get("host"), port or 1433, ds.get("username"), ds.get("password"),
+                        ds.get("domain"), ds.get("auth_mode"), timeout=timeout)
+    else:
+        raise RuntimeError(f"Unsupported db_type: {db_type}")
+
+
+def _lock_leader(path):
+    """
+    HEALTH_LOCK_FILE üzerinde process ömrü boyunca tutulan kilit; başka bir
+    process tutuyorsa None. Kilit desteklenmeyen platformda her process lider.
+    """
+    try:
+        handle = open(path, "a+")
+    except OSError:
+        log.warning("Health monitor lock file %s cannot be opened", path)
+        return None
+    try:
+        try:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:
+            import msvcrt
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        return None
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    return handle
+
+
+class HealthMonitor:
+
+    def __init__(self, interval=HEALTH_INTERVAL, jitter=HEALTH_JITTER,
+                 max_workers=HEALTH_MAX_WORKERS):
+        self.interval = interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self._table_ready = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader_lock = None
+
+    # ---------- state (repo: datasource_health) ---------- #
+
+    def _ensure_table(self, cur):
+        if not self._table_ready:
+            cur.execute(HEALTH_DDL)
+            self._table_ready = True
+
+    @staticmethod
+    def _row(ds_id, status, tcp_ms=None, login_ms=None, error=None):
+        return (ds_id, status, tcp_ms, login_ms, error,
+                1 if status == LOGIN_FAILED else 0, datetime.now())
+
+    def _write(self, rows):
+        if not rows:
+            return
+        with get_db() as con, con.cursor() as cur:
+            self._ensure_table(cur)
+            cur.executemany(_UPSERT, rows)
+
+    def record(self, ds_id, status, tcp_ms=None, login_ms=None, error=None):
+        self._write([self._row(ds_id, status, tcp_ms, login_ms, error)])
+
+    def get(self, ds_id):
+        return self.snapshot().get(ds_id)
+
+    def snapshot(self):
+        """ds_id -> son durum; repo okunamazsa boş (liste ekranı 'pending' gösterir)."""
+        try:
+            with get_db() as con, con.cursor() as cur:
+                self._ensure_table(cur)
+                cur.execute(
+                    "SELECT ds_id, status, tcp_ms, login_ms, error, login_failed, checked_at "
+                    "FROM datasource_health"
+                )
+                rows = cur.fetchall()
+        except Exception:
+            log.exception("Datasource health state cannot be read")
+            return {}
+        return {r["ds_id"]: r for r in rows}
+
+    def forget(self, ds_id):
+        """Datasource düzenlendi / silindi: eski durum gösterilmesin, login yeniden denensin."""
+        with get_db() as con, con.cursor() as cur:
+            self._ensure_table(cur)
+            cur.execute("DELETE FROM datasource_health WHERE ds_id=%s", (ds_id,))
+
+    # ---------- probing ---------- #
+
+    def _login(self, ds, tcp_ms):
+        started = time.perf_counter()
+        try:
+            login_check(ds)
+        except Exception as e:
+            return self._row(ds["id"], LOGIN_FAILED, tcp_ms=tcp_ms, error=str(e))
+        login_ms = round((time.perf_counter() - started) * 1000, 1)
+        return self._row(ds["id"], UP, tcp_ms=tcp_ms, login_ms=login_ms)
+
+    def refresh(self):
+        """Tek tur: tüm datasource'lar için TCP, açık olanlar için login."""
+        datasources = {ds["id"]: ds for ds in registry.all()}
+        previous = self.snapshot()
+        rows, logins = [], []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="ds-health") as pool:
+            for probe in sweep(datasources.values()):
+                ds = datasources[probe["ds_id"]]
+                last = previous.get(ds["id"]) or {}
+                if not probe["ok"]:
+                    rows.append(self._row(ds["id"], DOWN, error=probe["message"]))
+                elif last.get("login_failed"):
+                    # Hesap kilitlenmesin: edit ya da başarılı Check'e kadar login denenmez
+                    rows.append(self._row(ds["id"], LOGIN_FAILED, tcp_ms=probe["latency_ms"],
+                                          error=last.get("error")))
+                elif (ds.get("db_type") or "").lower() in SUPPORTED_DB_TYPES:
+                    # Sweep sürerken login'ler başlar
+                    logins.append(pool.submit(self._login, ds, probe["latency_ms"]))
+                else:
+                    rows.append(self._row(ds["id"], REACHABLE, tcp_ms=probe["latency_ms"]))
+        rows.extend(f.result() for f in logins)
+
+        self._write(rows)
+        stale = set(previous) - set(datasources)
+        if stale:
+            with get_db() as con, con.cursor() as cur:
+                cur.executemany("DELETE FROM datasource_health WHERE ds_id=%s",
+                                [(ds_id,) for ds_id in stale])
+
+    def _delay(self):
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _loop(self):
+        # İlk tur da kaydırılır; birden çok worker aynı anda başlamasın
+        if self._stop.wait(random.uniform(0, self.interval * self.jitter)):
+            return
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                log.exception("Datasource health refresh failed")
+            self._stop.wait(self._delay())
+
+    def start(self, lock_file=HEALTH_LOCK_FILE):
+        """Yalnızca kilidi alan process'te başlar; True: monitor bu process'te çalışıyor."""
+        if self._thread is not None:
+            return True
+        if lock_file and self._leader_lock is None:
+            self._leader_lock = _lock_leader(lock_file)
+            if self._leader_lock is None:
+                log.info("Datasource health monitor runs in another process")
+                return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ds-health-monitor", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+        if self._leader_lock is not None:
+            self._leader_lock.close()
+            self._leader_lock = None
+
+
+monitor = HealthMonitor()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Fleet genelinde TCP erişilebilirlik taraması.
+
+Tüm datasource'lara asyncio open_connection ile aynı anda bağlanmayı dener;
+eşzamanlılık semaphore ile sınırlıdır, her host için ayrı timeout uygulanır.
+sweep() sonuçları tamamlandıkça verir, böylece tüm tarama yaklaşık bir
+timeout süresinde biter ve route sonucu satır satır stream edebilir.
+"""
+import asyncio
+import socket
+import time
+
+from config import REACHABILITY_CONCURRENCY, REACHABILITY_TIMEOUT
+
+
+def describe_error(exc, host, port):
+    """Socket hatasını ekranda gösterilecek mesaja çevirir."""
+    if isinstance(exc, (socket.timeout, asyncio.TimeoutError, TimeoutError)):
+        return ("Connection timed out. Host or network may be unreachable, "
+                "or a firewall is dropping packets.")
+    if isinstance(exc, ConnectionRefusedError):
+        return ("Connection refused. Host is reachable but the port is closed "
+                "or no service is listening.")
+    return f"Socket error while connecting to {host}:{port}: {exc}"
+
+
+def _address(ds):
+    host = (ds.get("host") or "").strip()
+    try:
+        port = int(ds.get("port") or 0)
+    except (TypeError, ValueError):
+        port = 0
+    return host, port
+
+
+async def _probe(ds, sem, timeout):
+    host, port = _address(ds)
+    result = {"ds_id": ds.get("id"), "host": host, "port": port,
+              "ok": False, "latency_ms": None}
+
+    if not host:
+        result["message"] = "Host is empty."
+        return result
+    if not port:
+        result["message"] = "Port is empty or invalid."
+        return result
+
+    async with sem:
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except Exception as e:
+            result["message"] = describe_error(e, host, port)
+            return result
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    result["ok"] = True
+    result["message"] = f"{host}:{port} is reachable over TCP."
+    return result
+
+
+def sweep(datasources, concurrency=None, timeout=None):
+    """
+    datasources için TCP denemesi yapar; her sonucu (dict) tamamlandığı
+    sırayla yield eder. Kendi event loop'unu açar, request thread'inde
+    senkron generator olarak kullanılabilir.
+    """
+    concurrency = concurrency or REACHABILITY_CONCURRENCY
+    timeout = timeout or REACHABILITY_TIMEOUT
+
+    loop = asyncio.new_event_loop()
+    try:
+        sem = asyncio.Semaphore(concurrency)
+        pending = {loop.create_task(_probe(ds, sem, timeout)) for ds in datasources}
+        while pending:
+            done, pending = loop.run_until_complete(
+                asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        # İstemci stream'i yarıda bırakırsa kalan denemeler iptal edilir
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+        loop.run_until_complete(asyncio.sleep(0))
+        loop.close()
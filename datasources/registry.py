@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Process içi datasource registry.
+
+Run-test / run-detail / scan ekranları datasource'ları her istekte
+(şifreleriyle) repo'dan çekmek yerine buradan okur. Dropdown'lar için
+choices() kimlik bilgisi içermeyen kopyalar döner; bağlanmak için
+get(ds_id) tam kaydı O(1) verir. new / edit / delete registry.bump() çağırır.
+"""
+from cache import VersionedCatalog
+from config import CATALOG_CHECK_INTERVAL
+
+
+REGISTRY_SQL = """
+    SELECT
+        ds_id AS id, ds_name AS name,
+        db_type, host, port,
+        auth_mode, domain,
+        username, password,
+        database_name,
+        oracle_service_name, oracle_sid
+    FROM datasources
+    ORDER BY ds_name
+"""
+
+# Ekrana gidebilecek alanlar; username / password / domain hariç
+PUBLIC_FIELDS = (
+    "id", "name", "db_type", "host", "port",
+    "database_name", "oracle_service_name", "oracle_sid",
+)
+
+
+def public_view(ds):
+    return {k: ds.get(k) for k in PUBLIC_FIELDS}
+
+
+class DatasourceRegistry(VersionedCatalog):
+
+    def choices(self, db_types):
+        """db_type (veya db_type listesi) için kimlik bilgisiz dropdown listesi."""
+        if isinstance(db_types, str):
+            db_types = (db_types,)
+        wanted = {(t or "").lower() for t in db_types}
+        return [public_view(ds) for ds in self.all()
+                if (ds.get("db_type") or "").lower() in wanted]
+
+
+registry = DatasourceRegistry("datasources", REGISTRY_SQL, CATALOG_CHECK_INTERVAL)
@@ -1,30 +1,219 @@
 # -*- coding: utf-8 -*-
+import threading
+import time
+
 import pymysql
 from pymysql.cursors import DictCursor
-from config import DB_CFG
+from flask import g, has_app_context
 
-def get_db():
-    return pymysql.connect(
-        host=DB_CFG["host"],
-        user=DB_CFG["user"],
-        password=DB_CFG["password"],
-        database=DB_CFG["database"],
-        cursorclass=DictCursor,
-        autocommit=True
-    )
+from config import (
+    DB_CFG,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_PING_INTERVAL,
+)
+
+
+# ---------------------- Repo connection pool ----------------------
+
+class RepoConnectionPool:
+    """
+    Repo MySQL bağlantıları için sınırlı boyutlu havuz.
+
+    - En fazla `size` bağlantı açık olur; dolu havuzda checkout `timeout`
+      saniye bekler.
+    - Uzun süre boşta kalan bağlantı checkout'ta ping ile kontrol edilir,
+      cevap vermezse yenisi açılır.
+    - `idle_timeout`'u aşan boştaki bağlantılar kapatılır.
+    """
 
-def get_version_line():
+    def __init__(self, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 idle_timeout=DB_POOL_IDLE_TIMEOUT, ping_interval=DB_POOL_PING_INTERVAL):
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []             # [(conn, last_used)]
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        return pymysql.connect(
+            host=DB_CFG["host"],
+            port=DB_CFG.get("port", 3306),
+            user=DB_CFG["user"],
+            password=DB_CFG["password"],
+            database=DB_CFG["database"],
+            cursorclass=DictCursor,
+            autocommit=True
+        )
+
+    def _evict_idle(self):
+        """idle_timeout'u aşanları listeden çıkarır; kapatmayı kilit dışında yaparız."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            stale = [c for c, used in self._idle if used < cutoff]
+            self._idle = [(c, used) for c, used in self._idle if used >= cutoff]
+        for conn in stale:
+            _close_quietly(conn)
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise RuntimeError("Repository connection pool exhausted.")
+
+        try:
+            self._evict_idle()
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    conn, used = self._idle.pop()
+                if time.monotonic() - used < self.ping_interval:
+                    return conn
+                try:
+                    conn.ping(reconnect=False)
+                    return conn
+                except Exception:
+                    _close_quietly(conn)
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, discard=False):
+        try:
+            if discard or not conn.open:
+                _close_quietly(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+        self._evict_idle()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+
+def _close_quietly(conn):
     try:
-        con = get_db()
-        with con.cursor() as cur:
-            # Eğer ileride id eklersen: ORDER BY id DESC LIMIT 1
-            cur.execute("SELECT line FROM versions LIMIT 1;")
-            row = cur.fetchone()
-            return row["line"] if row else ""
+        conn.close()
     except Exception:
-        return ""
-    finally:
+        pass
+
+
+class PooledConnection:
+    """
+    pymysql bağlantısını saran proxy.
+
+    close() ve `with` çıkışı bağlantıyı kapatmak yerine havuza iade eder.
+    Request'e bağlı bağlantılarda close() hiçbir şey yapmaz; iade app
+    context teardown'da olur.
+    """
+
+    def __init__(self, pool, conn, request_scoped=False):
+        self._pool = pool
+        self._conn = conn
+        self._request_scoped = request_scoped
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise pymysql.err.InterfaceError("Connection already returned to pool.")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if not self._request_scoped:
+            self._release()
+
+    def _release(self, discard=False):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn, discard=discard)
+
+    def __del__(self):
+        # close() unutulursa da slot geri verilsin
         try:
-            con.close()
+            self._release()
         except Exception:
             pass
+
+
+pool = RepoConnectionPool()
+
+
+def get_db():
+    """
+    Repo bağlantısı.
+
+    App context içinde aynı request boyunca tek bir havuz bağlantısı
+    paylaşılır ve teardown'da iade edilir. Context dışında (arka plan işleri,
+    CLI) çağıranın close() ile iade etmesi gerekir.
+    """
+    if has_app_context():
+        con = g.get("_repo_con")
+        if con is None or con._conn is None:
+            con = PooledConnection(pool, pool.acquire(), request_scoped=True)
+            g._repo_con = con
+        return con
+    return PooledConnection(pool, pool.acquire())
+
+
+def release_db(exc=None):
+    con = g.pop("_repo_con", None)
+    if con is not None:
+        con._release(discard=exc is not None)
+
+
+def init_app(app):
+    app.teardown_appcontext(release_db)
+
+
+# ---------------------- Cache versions ----------------------
+# Process içi cache'ler (checkpoint kataloğu vb.) repo'daki bu sayaçla
+# tutarlı tutulur: yazan taraf bump eder, okuyanlar versiyon değişince yeniden yükler.
+
+CACHE_VERSIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS cache_versions (
+        name     VARCHAR(50) PRIMARY KEY,
+        version  BIGINT      NOT NULL DEFAULT 0
+    )
+"""
+
+_versions_ready = False
+
+
+def _ensure_versions(cur):
+    global _versions_ready
+    if not _versions_ready:
+        cur.execute(CACHE_VERSIONS_DDL)
+        _versions_ready = True
+
+
+def get_cache_version(name):
+    with get_db() as con, con.cursor() as cur:
+        _ensure_versions(cur)
+        cur.execute("SELECT version FROM cache_versions WHERE name=%s", (name,))
+        row = cur.fetchone()
+        return row["version"] if row else 0
+
+
+def bump_cache_version(name):
+    with get_db() as con, con.cursor() as cur:
+        _ensure_versions(cur)
+        cur.execute(
+            """
+            INSERT INTO cache_versions (name, version) VALUES (%s, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+            """,
+            (name,),
+        )
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+In-process background jobs.
+
+Uzun süren taramalar request thread'inde değil burada çalışır; route job'ı
+submit eder, job id'yi döner, ilerleme ve kısmi sonuçlar JSON endpoint'ten
+okunur.
+
+Bellek sınırlı tutulur: bir job en fazla JOB_MAX_RESULTS sonucu saklar
+(daha eskileri düşer, sonuç indeksleri mutlak kalır; taramalar zaten
+scan_results'a yazılır) ve biten job'lardan en fazla JOB_MAX_RETAINED
+tanesi JOB_RETENTION_SECONDS boyunca tutulur.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    JOB_MAX_WORKERS,
+    JOB_QUICK_WORKERS,
+    JOB_RETENTION_SECONDS,
+    JOB_MAX_RETAINED,
+    JOB_MAX_RESULTS,
+)
+
+
+class Job:
+    def __init__(self, kind, total=0, meta=None, owner=None, max_results=JOB_MAX_RESULTS):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.meta = meta or {}
+        self.owner = owner          # job'ı başlatan kullanıcının user_id'si
+        self.status = "queued"      # queued / running / done / error
+        self.total = total
+        self.completed = 0
+        self.results = []
+        self.dropped = 0            # sınır yüzünden atılan en eski sonuç sayısı
+        self.max_results = max_results
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def add_result(self, item):
+        """Kısmi sonuç ekler ve ilerlemeyi bir artırır (thread-safe)."""
+        with self._lock:
+            self.results.append(item)
+            self.completed += 1
+            overflow = len(self.results) - self.max_results
+            if self.max_results and overflow > 0:
+                del self.results[:overflow]
+                self.dropped += overflow
+
+    def result(self):
+        """Tek sonuçlu job'lar için (run-test / run-detail) ilk sonuç; yoksa None."""
+        with self._lock:
+            return self.results[0] if self.results and not self.dropped else None
+
+    def to_dict(self, since=0):
+        """
+        since: istemcinin daha önce aldığı sonuç sayısı; yalnızca yenileri döner.
+        Sınır yüzünden düşen sonuçlar atlanır.
+        """
+        with self._lock:
+            end = self.dropped + len(self.results)
+            since = max(self.dropped, min(int(since or 0), end))
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "meta": self.meta,
+                "status": self.status,
+                "total": self.total,
+                "completed": self.completed,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "results": self.results[since - self.dropped:],
+                "dropped": self.dropped,
+                "next": end,
+            }
+
+
+class JobManager:
+    def __init__(self, max_workers=JOB_MAX_WORKERS, retention=JOB_RETENTION_SECONDS,
+                 max_retained=JOB_MAX_RETAINED, quick_workers=JOB_QUICK_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        # Tek checkpoint'lik işler (run-test / run-detail) uzun taramaların arkasında beklemesin
+        self._quick_executor = ThreadPoolExecutor(max_workers=quick_workers, thread_name_prefix="job-quick")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.retention = retention
+        self.max_retained = max_retained
+
+    def submit(self, kind, fn, total=0, meta=None, owner=None, quick=False):
+        """
+        fn(job) arka planda çalışır; sonuçları job.add_result() ile bildirir.
+        owner: job'ı görebilecek kullanıcının user_id'si. quick=True kısa
+        işler için ayrı worker'larda çalışır.
+        """
+        job = Job(kind, total=total, meta=meta, owner=owner)
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+        executor = self._quick_executor if quick else self._executor
+        executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id, owner=None):
+        """owner verilirse yalnızca o kullanıcının job'ı döner."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or (owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def _run(self, job, fn):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            fn(job)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "error"
+        finally:
+            job.finished_at = time.time()
+
+    def _purge(self):
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+        # Süresi dolmamış olsa da en eski biten job'lar sınırın üstündeyse atılır
+        finished = sorted((j for j in self._jobs.values() if j.finished_at), key=lambda j: j.finished_at)
+        for job in finished[:max(0, len(finished) - self.max_retained)]:
+            del self._jobs[job.id]
+
+
+job_manager = JobManager()
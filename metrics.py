@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Süre histogramları ve Prometheus text formatında /metrics çıktısı.
+
+Gözlem başına maliyet bir lock + bucket araması; production'da açık
+kalabilir. Kullanım:
+
+    with timed("sql_test", db_type="oracle", checkpoint=name, datasource=ds_name):
+        cur.execute(sql)
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Saniye cinsinden üst sınırlar
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+
+    def __init__(self, name, help_text, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}           # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n) or "") for n in self.labelnames)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key in sorted(snapshot):
+            series = snapshot[key]
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+scan_phase_seconds = Histogram(
+    "dbscan_phase_seconds",
+    "Duration of checkpoint execution phases (connect, pre_sql, sql_test, sql_detail, evaluate).",
+    ("phase", "db_type", "checkpoint", "datasource"),
+)
+
+render_seconds = Histogram(
+    "dbscan_template_render_seconds",
+    "Template rendering duration.",
+    ("template",),
+)
+
+HISTOGRAMS = (scan_phase_seconds, render_seconds)
+
+
+def observe_phase(phase, seconds, db_type=None, checkpoint=None, datasource=None):
+    scan_phase_seconds.observe(
+        seconds, phase=phase, db_type=db_type, checkpoint=checkpoint, datasource=datasource,
+    )
+
+
+@contextmanager
+def timed(phase, db_type=None, checkpoint=None, datasource=None):
+    """Blok süresini scan_phase_seconds'a yazar (hata olsa da)."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        observe_phase(phase, time.monotonic() - started, db_type, checkpoint, datasource)
+
+
+def render_all():
+    return "\n".join(h.render() for h in HISTOGRAMS) + "\n"
+
+
+def init_app(app):
+    """Template render sürelerini Flask sinyalleriyle ölçer."""
+    from flask import g, before_render_template, template_rendered
+
+    def _before(sender, template, context, **extra):
+        g._render_started = time.monotonic()
+
+    def _after(sender, template, context, **extra):
+        started = g.pop("_render_started", None)
+        if started is not None:
+            render_seconds.observe(time.monotonic() - started, template=template.name)
+
+    before_render_template.connect(_before, app, weak=False)
+    template_rendered.connect(_after, app, weak=False)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Komut satırından tarama (Flask / HTTP olmadan, cron için).
+
+Datasource ve checkpoint'ler repo'dan okunur, db_type / severity / isim
+desenine göre süzülür. Datasource'lar host'a göre process'lere dağıtılır;
+her process kendi içinde fleet scan'i (thread + host limiti) çalıştırır.
+Her checkpoint sonucu tamamlandığı anda bir JSON satırı olarak yazılır.
+
+    python scan_cli.py --db-type oracle --severity high,critical
+    python scan_cli.py --datasource 'PROD_*' --name '*PASSWORD*' --processes 4 -o audit.jsonl
+    python scan_cli.py --save --fail-on FAIL,ERROR,TIMEOUT      # cron: sonuç repo'ya, exit code 1
+"""
+import argparse
+import datetime
+import fnmatch
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import FLEET_MAX_WORKERS, FLEET_MAX_PER_HOST, SCAN_DEADLINE_SECONDS
+
+
+_DONE = "__done__"
+_queue = None       # worker process'lerde sonuç kuyruğu
+
+
+def _csv(value):
+    return [v.strip().lower() for v in (value or "").split(",") if v.strip()]
+
+
+def _matches(value, patterns):
+    """Desen verilmemişse her şey eşleşir; fnmatch, büyük/küçük harf duyarsız."""
+    if not patterns:
+        return True
+    value = (value or "").lower()
+    return any(fnmatch.fnmatchcase(value, p.lower()) for p in patterns)
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+# ---------- selection ---------- #
+
+def select_datasources(args):
+    from checkpoints.engine import SUPPORTED_DB_TYPES
+    from datasources.registry import registry
+
+    db_types = (set(_csv(args.db_type)) or set(SUPPORTED_DB_TYPES)) & set(SUPPORTED_DB_TYPES)
+    ids = {int(i) for i in _csv(args.ds_id)}
+    return [
+        ds for ds in registry.all()
+        if (ds.get("db_type") or "").lower() in db_types
+        and (not ids or ds["id"] in ids)
+        and _matches(ds.get("name"), args.datasource)
+    ]
+
+
+def select_checkpoints(args):
+    from checkpoints.catalog import catalog
+
+    db_types = set(_csv(args.db_type))
+    severities = set(_csv(args.severity))
+    return [
+        cp for cp in catalog.all()
+        if (not db_types or (cp.get("db_type") or "").lower() in db_types)
+        and (not severities or (cp.get("severity") or "").lower() in severities)
+        and _matches(cp.get("name"), args.name)
+    ]
+
+
+def partition(datasources, checkpoints, buckets):
+    """
+    Datasource'ları process'lere böler. Aynı host'un datasource'ları aynı
+    process'e düşer ki FLEET_MAX_PER_HOST limiti process'ler arası da geçerli
+    olsun; gruplar checkpoint sayısına göre en boş process'e atanır.
+    """
+    from checkpoints.engine import matching_checkpoints
+
+    by_host = {}
+    for ds in datasources:
+        by_host.setdefault((ds.get("host") or "").strip().lower(), []).append(ds)
+
+    groups = sorted(
+        by_host.values(),
+        key=lambda g: sum(len(matching_checkpoints(ds, checkpoints)) for ds in g),
+        reverse=True,
+    )
+    loads = [0] * max(1, buckets)
+    parts = [[] for _ in loads]
+    for group in groups:
+        i = loads.index(min(loads))
+        parts[i].extend(group)
+        loads[i] += sum(len(matching_checkpoints(ds, checkpoints)) for ds in group)
+    return [p for p in parts if p]
+
+
+# ---------- worker process ---------- #
+
+def _init_worker(result_queue):
+    global _queue
+    _queue = result_queue
+
+
+def _scan_part(datasources, checkpoints, threads, per_host, deadline_seconds, run_id):
+    """Worker: kendi datasource grubunu fleet scan ile tarar, sonuçları kuyruğa yazar."""
+    from checkpoints.fleet import iter_fleet_scan
+
+    writer = None
+    if run_id is not None:
+        from checkpoints.store import ScanResultWriter
+        writer = ScanResultWriter(run_id)
+
+    def on_result(ds, res):
+        if writer is not None:
+            writer.add(ds, res)
+        line = {
+            "ds_id": ds.get("id"),
+            "ds_name": ds.get("name"),
+            "db_type": ds.get("db_type"),
+            "host": ds.get("host"),
+        }
+        line.update((k, _jsonable(v)) for k, v in res.items())
+        line.setdefault("executed_at", datetime.datetime.now().isoformat(timespec="seconds"))
+        _queue.put(line)
+
+    errors = []
+    try:
+        for scan in iter_fleet_scan(datasources, checkpoints, threads, per_host,
+                                    on_result=on_result, deadline_seconds=deadline_seconds):
+            if scan.get("error"):
+                errors.append({"ds_name": scan.get("ds_name"), "error": scan["error"]})
+    finally:
+        try:
+            if writer is not None:
+                writer.flush()
+        finally:
+            _queue.put(_DONE)
+    return errors
+
+
+# ---------- main ---------- #
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        description="Run checkpoints against datasources without the web UI; "
+                    "writes one JSON line per result.")
+    sel = p.add_argument_group("selection")
+    sel.add_argument("--db-type", help="comma separated: oracle,mssql (default: all supported)")
+    sel.add_argument("--severity", help="comma separated checkpoint severities, e.g. high,critical")
+    sel.add_argument("--name", action="append",
+                     help="checkpoint name glob, case-insensitive (repeatable)")
+    sel.add_argument("--datasource", action="append",
+                     help="datasource name glob, case-insensitive (repeatable)")
+    sel.add_argument("--ds-id", help="comma separated datasource ids")
+
+    run = p.add_argument_group("execution")
+    run.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1),
+                     help="worker processes (default: %(default)s)")
+    run.add_argument("--threads", type=int, default=FLEET_MAX_WORKERS,
+                     help="datasources scanned in parallel per process (default: %(default)s)")
+    run.add_argument("--per-host", type=int, default=FLEET_MAX_PER_HOST,
+                     help="concurrent scans per host (default: %(default)s)")
+    run.add_argument("--deadline", type=float, default=SCAN_DEADLINE_SECONDS,
+                     help="overall scan deadline in seconds, 0 = none (default: %(default)s)")
+
+    out = p.add_argument_group("output")
+    out.add_argument("-o", "--output", help="write JSON lines to this file instead of stdout")
+    out.add_argument("--save", action="store_true",
+                     help="also store the run in scan_runs / scan_results like the UI does")
+    out.add_argument("--fail-on", default="",
+                     help="comma separated statuses that make the exit code 1, e.g. FAIL,ERROR,TIMEOUT")
+    out.add_argument("--dry-run", action="store_true",
+                     help="only print what would be scanned")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    datasources = select_datasources(args)
+    checkpoints = select_checkpoints(args)
+
+    from checkpoints.engine import matching_checkpoints
+    total = sum(len(matching_checkpoints(ds, checkpoints)) for ds in datasources)
+    parts = partition(datasources, checkpoints, args.processes)
+
+    print(f"{len(datasources)} datasource(s), {len(checkpoints)} checkpoint(s), "
+          f"{total} check(s) in {len(parts)} process(es)", file=sys.stderr)
+    if args.dry_run:
+        for ds in datasources:
+            print(f"  {ds['name']} [{ds['db_type']}] {ds.get('host')}:{ds.get('port')} "
+                  f"- {len(matching_checkpoints(ds, checkpoints))} check(s)", file=sys.stderr)
+        return 0
+    if not total:
+        return 0
+
+    run_id = None
+    if args.save:
+        from checkpoints.store import create_run
+        run_id = create_run("cli", os.environ.get("USER"), total)
+
+    fail_on = {s.upper() for s in _csv(args.fail_on)}
+    summary = {}
+    failed = False      # --fail-on'daki bir status görüldü
+    crashed = False     # bir worker process hata ile bitti
+    started = time.monotonic()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    # spawn: hedef sürücüleri ve repo bağlantıları fork ile paylaşılmasın
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    try:
+        with ProcessPoolExecutor(max_workers=len(parts), mp_context=ctx,
+                                 initializer=_init_worker, initargs=(result_queue,)) as pool:
+            futures = [
+                pool.submit(_scan_part, part, checkpoints, args.threads, args.per_host,
+                            args.deadline, run_id)
+                for part in parts
+            ]
+            finished = 0
+            while finished < len(parts):
+                try:
+                    line = result_queue.get(timeout=0.5)
+                except queue.Empty:
+                    # Worker çökerse _DONE hiç gelmeyebilir
+                    if all(f.done() for f in futures):
+                        break
+                    continue
+                if line == _DONE:
+                    finished += 1
+                    continue
+                summary[line["status"]] = summary.get(line["status"], 0) + 1
+                failed = failed or line["status"] in fail_on
+                out.write(json.dumps(line) + "\n")
+                out.flush()
+
+            for f in futures:
+                try:
+                    for err in f.result():
+                        print(f"{err['ds_name']}: {err['error']}", file=sys.stderr)
+                except Exception as e:
+                    print(f"worker failed: {e}", file=sys.stderr)
+                    crashed = True
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if run_id is not None:
+            from checkpoints.store import finish_run
+            finish_run(run_id, "error" if crashed else "done", summary)
+
+    print(f"done in {time.monotonic() - started:.1f}s: "
+          + ", ".join(f"{k}={v}" for k, v in sorted(summary.items())), file=sys.stderr)
+    return 1 if failed or crashed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+# Testler repo kökünden (`python -m pytest` gibi) de, tests/ içinden de çalışsın
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
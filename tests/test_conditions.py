@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+
+import pytest
+
+from checkpoints.conditions import compile_condition, ConditionError
+from checkpoints.engine import evaluate_condition
+
+
+def check(condition, value):
+    return compile_condition(condition)(value)
+
+
+@pytest.mark.parametrize("condition, value, expected", [
+    ("> 0", 1, True),
+    ("> 0", 0, False),
+    ("== 0", 0, True),
+    ("!= 0", 3, True),
+    ("<= 5", 5, True),
+    (">= 1 and <= 5", 3, True),
+    (">= 1 and <= 5", 6, False),
+    ("== 'A' or == 'B'", "B", True),
+    ("== 'A' or == 'B'", "C", False),
+])
+def test_comparisons(condition, value, expected):
+    assert check(condition, value) is expected
+
+
+@pytest.mark.parametrize("condition, value, expected", [
+    ("between 1 and 10", 1, True),
+    ("between 1 and 10", 10, True),
+    ("between 1 and 10", 11, False),
+    ("not between 1 and 10", 11, True),
+    ("BETWEEN 'A' AND 'C'", "B", True),
+    ("between 1 and 10 or == 99", 99, True),
+])
+def test_between(condition, value, expected):
+    assert check(condition, value) is expected
+
+
+@pytest.mark.parametrize("condition, value, expected", [
+    ("in ('OPEN', 'EXPIRED')", "OPEN", True),
+    ("in ('OPEN', 'EXPIRED')", "LOCKED", False),
+    ("not in (1, 2)", 3, True),
+    ("not in (1, 2)", 2, False),
+    ("in (1, 2)", decimal.Decimal("2"), True),
+    ("in ('1', '2')", 2, True),
+])
+def test_in_list(condition, value, expected):
+    assert check(condition, value) is expected
+
+
+@pytest.mark.parametrize("condition, value, expected", [
+    # Eski eval davranışı: metin literal'ında alt dizge araması
+    ("in 'ABC'", "B", True),
+    ("in 'ABC'", "AB", True),
+    ("in 'ABC'", "D", False),
+    ("not in 'ABC'", "D", True),
+    ("in ('ABC')", "BC", True),       # parantez tuple yapmaz
+])
+def test_in_string_is_substring(condition, value, expected):
+    assert check(condition, value) is expected
+
+
+def test_in_string_with_non_string_value_is_an_error():
+    result, error = evaluate_condition(1, "in 'ABC'")
+    assert result is None
+    assert "Condition evaluation error" in error
+
+
+@pytest.mark.parametrize("condition, value, expected", [
+    ("is None", None, True),
+    ("is None", 0, False),
+    ("is not None", "", True),
+    ("is True", True, True),
+])
+def test_is(condition, value, expected):
+    assert check(condition, value) is expected
+
+
+@pytest.mark.parametrize("condition, value, expected", [
+    ("> 0", decimal.Decimal("1.5"), True),
+    ("== 2", decimal.Decimal("2.00"), True),
+    ("> 10", "12", True),              # sayısal metin sayıya çevrilir
+    ("== '12'", 12, True),
+    ("== 'OPEN'", b"OPEN", True),
+    ("> '2024-01-01'", datetime.date(2024, 6, 1), True),
+    ("< '2024-01-01 00:00:00'", datetime.datetime(2023, 12, 31, 23, 0), True),
+    ("== 'abc'", "ABC", False),        # metin karşılaştırması büyük/küçük harf duyarlı
+])
+def test_type_coercion(condition, value, expected):
+    assert check(condition, value) is expected
+
+
+def test_lob_values_are_read():
+    class Lob:
+        def read(self):
+            return "OPEN"
+
+    assert check("== 'OPEN'", Lob())
+
+
+def test_quoted_operators_do_not_split_clauses():
+    assert check("== 'a and b'", "a and b")
+    assert check("in ('x or y', 'z')", "x or y")
+    assert check("== 'x or == y'", "x or == y")
+    assert not check("== 'x or == y'", "x")
+    assert check("in ('a and is b',)", "a and is b")
+    assert check("== 'a' or in ('b and > c',)", "b and > c")
+
+
+@pytest.mark.parametrize("condition", [
+    "",
+    "> ",
+    "> __import__('os')",
+    "> 1 > 2",
+    "== value",
+    "in 5",
+    "is 1",
+    "between 1",
+    "and > 1",
+])
+def test_invalid_conditions(condition):
+    with pytest.raises(ConditionError):
+        compile_condition(condition)
+
+
+def test_evaluate_condition_results():
+    assert evaluate_condition(1, "> 0") == ((True, "1 > 0"), None)
+    assert evaluate_condition(1, "") == (None, None)
+    result, error = evaluate_condition(1, "> foo(")
+    assert result is None and error.startswith("Condition syntax error")
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+import pytest
+
+from checkpoints import engine
+from checkpoints.detail import open_detail_cursor
+
+
+class FailingCursor:
+    def __init__(self, error):
+        self.error = error
+
+    def execute(self, sql):
+        raise self.error
+
+    def fetchone(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, error):
+        self.error = error
+        self.timeout = 0
+
+    def cursor(self):
+        return FailingCursor(self.error)
+
+    def commit(self):
+        pass
+
+
+CHECKPOINT = {"id": 1, "name": "cp", "db_type": "mssql", "sql_test": "SELECT 1", "test_condition": "> 0"}
+
+
+@pytest.mark.parametrize("timeout", [None, 0, 5])
+@pytest.mark.parametrize("message, status", [
+    ("[HYT00] [Microsoft][ODBC Driver 18 for SQL Server]Query timeout expired", "TIMEOUT"),
+    ("DPI-1067: call timeout of 5000 ms exceeded", "TIMEOUT"),
+    ("ORA-01013: user requested cancel of current operation", "TIMEOUT"),
+    ("ORA-00942: table or view does not exist", "ERROR"),
+])
+def test_run_test_classifies_timeout_and_error(timeout, message, status):
+    res = engine.run_test(FakeConnection(RuntimeError(message)), CHECKPOINT, timeout=timeout)
+    assert res["status"] == status
+    assert res["error"].startswith("SQL Test")
+    assert message in res["error"]
+    if status == "TIMEOUT" and timeout:
+        assert f"{timeout:g}s" in res["error"]
+
+
+def test_run_test_without_any_limit(monkeypatch):
+    # CHECK_TIMEOUT_SECONDS = 0 ("sınırsız") ve scan deadline'ı yok
+    monkeypatch.setattr(engine, "CHECK_TIMEOUT_SECONDS", 0)
+    res = engine.run_test(FakeConnection(RuntimeError("[HYT00] timeout expired")), CHECKPOINT)
+    assert res["status"] == "TIMEOUT"
+
+
+@pytest.mark.parametrize("timeout", [None, 30])
+def test_detail_timeout_without_limit(timeout):
+    conn = FakeConnection(RuntimeError("[HYT00] timeout expired"))
+    with pytest.raises(RuntimeError, match="SQL Detail timed out"):
+        open_detail_cursor(conn, {"sql_detail": "SELECT 1"}, timeout=timeout)
+
+
+def test_engine_import_does_not_load_web_modules():
+    # scan_cli worker'ları engine / fleet'i import eder; Flask ve route'lar yüklenmemeli
+    code = (
+        "import sys, checkpoints.engine, checkpoints.fleet; "
+        "print(sorted(m for m in ('flask', 'checkpoints.routes', 'jobs') if m in sys.modules))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from checkpoints import fleet
+
+
+def test_host_limit_is_shared_between_fleet_scans(monkeypatch):
+    monkeypatch.setattr(fleet, "_slots", fleet._FleetSlots(max_workers=8, max_per_host=2))
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+
+    def scan(ds, checkpoints, on_result, deadline):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+        return {"ds_id": ds["id"], "ds_name": str(ds["id"]), "results": []}
+
+    def job(offset, out):
+        datasources = [{"id": offset + i, "host": "db1"} for i in range(4)]
+        out.extend(fleet.iter_fleet_scan(datasources, [], max_workers=4, max_per_host=2,
+                                         scan=scan, deadline_seconds=0))
+
+    results = []
+    jobs = [threading.Thread(target=job, args=(n * 10, results)) for n in range(2)]
+    for t in jobs:
+        t.start()
+    for t in jobs:
+        t.join()
+
+    assert len(results) == 8
+    assert running["max"] == 2
+
+
+def test_slots_are_released_when_consumer_stops_early(monkeypatch):
+    slots = fleet._FleetSlots(max_workers=2, max_per_host=2)
+    monkeypatch.setattr(fleet, "_slots", slots)
+    datasources = [{"id": i, "host": "db1"} for i in range(3)]
+    scan = lambda ds, checkpoints, on_result, deadline: {"ds_id": ds["id"], "results": []}
+
+    scans = fleet.iter_fleet_scan(datasources, [], scan=scan, deadline_seconds=0)
+    next(scans)
+    scans.close()
+    assert slots.try_acquire("db1") and slots.try_acquire("db1")
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from checkpoints import engine
+from checkpoints.pool import TargetConnectionPool
+
+
+class FakeCursor:
+    def execute(self, sql):
+        pass
+
+    def fetchone(self):
+        return (1,)
+
+    def nextset(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.timeout = 0
+
+    def cursor(self):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(TargetConnectionPool):
+    def __init__(self):
+        super().__init__(max_per_ds=2, timeout=1)
+        self.opened = []
+
+    def _connect(self, ds):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+    def _start_janitor(self):
+        pass
+
+
+DS = {"id": 1, "db_type": "mssql", "host": "h", "password": "new"}
+
+
+def test_connection_is_reused():
+    pool = FakePool()
+    conn = pool.acquire(DS)
+    pool.release(DS, conn)
+    assert pool.acquire(DS) is conn
+
+
+def test_tainted_connection_is_not_reused():
+    pool = FakePool()
+    conn = pool.acquire(DS)
+    pool.taint(conn)
+    pool.release(DS, conn)
+    assert conn.closed
+    assert pool.acquire(DS) is not conn
+
+
+def test_release_with_old_ds_does_not_reset_pool():
+    pool = FakePool()
+    kept = pool.acquire(DS)
+    pool.release(DS, kept)
+    conn = pool.acquire(DS)
+    # Edit öncesi alınmış eski ds dict'iyle iade
+    pool.release(dict(DS, password="old"), conn)
+    assert not conn.closed
+    assert pool.stats()[1] == {"idle": 1, "in_use": 0}
+    assert pool.acquire(DS) is conn
+
+
+def test_scan_renews_connection_after_pre_sql(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(engine, "target_pool", pool)
+    checkpoints = [
+        {"id": 1, "name": "a", "db_type": "mssql", "pre_sql_test": "USE msdb", "sql_test": "SELECT 1",
+         "test_condition": "== 1"},
+        {"id": 2, "name": "b", "db_type": "mssql", "sql_test": "SELECT 1", "test_condition": "== 1"},
+    ]
+    scan = engine.scan_datasource(DS, checkpoints)
+    assert [r["status"] for r in scan["results"]] == ["PASS", "PASS"]
+    first, second = pool.opened
+    assert first.closed and not second.closed
+    assert pool.stats()[1] == {"idle": 1, "in_use": 0}
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from checkpoints.sqlscript import compile_script, run_script, split_oracle, split_tsql
+
+
+# ---------- Oracle ---------- #
+
+def test_oracle_semicolons_split_statements():
+    assert split_oracle("alter session set nls_date_format='YYYY'; select 1 from dual;") == [
+        "alter session set nls_date_format='YYYY'",
+        "select 1 from dual",
+    ]
+
+
+def test_oracle_quoted_separators_are_ignored():
+    script = """
+        select 'a;b' from dual;
+        select q'[it's; fine]' from dual;
+        select nq'{x;y}' from dual;
+        select "odd;name" from t
+    """
+    assert split_oracle(script) == [
+        "select 'a;b' from dual",
+        "select q'[it's; fine]' from dual",
+        "select nq'{x;y}' from dual",
+        'select "odd;name" from t',
+    ]
+
+
+def test_oracle_comments_are_ignored():
+    script = """
+        -- leading comment; not a statement
+        /* block ; comment */
+        select 1 from dual; -- trailing ; comment
+        select 2 /* ; */ from dual
+    """
+    assert split_oracle(script) == [
+        "select 1 from dual",
+        "select 2 /* ; */ from dual",
+    ]
+
+
+def test_oracle_plsql_block_ends_with_slash():
+    script = """
+        begin
+          dbms_output.put_line('x');
+          null;
+        end;
+        /
+        select 1 from dual
+    """
+    statements = split_oracle(script)
+    assert len(statements) == 2
+    assert statements[0].startswith("begin") and statements[0].endswith("end;")
+    assert statements[1] == "select 1 from dual"
+
+
+@pytest.mark.parametrize("head", [
+    "declare x number; begin x := 1; end;",
+    "create or replace procedure p is begin null; end;",
+    "create editionable function f return number is begin return 1; end;",
+    "CREATE OR REPLACE PACKAGE pk AS PROCEDURE p; END pk;",
+])
+def test_oracle_plsql_starts(head):
+    assert split_oracle(head + "\n/\nselect 1 from dual") == [head, "select 1 from dual"]
+
+
+def test_oracle_with_function_is_one_statement():
+    script = """
+        with function f return number is begin return 1; end;
+        select f from dual;
+        /
+        select 2 from dual
+    """
+    assert split_oracle(script) == [
+        "with function f return number is begin return 1; end;\n        select f from dual",
+        "select 2 from dual",
+    ]
+
+
+def test_oracle_plain_with_query_is_sql():
+    assert split_oracle("with x as (select 1 a from dual) select a from x; select 2 from dual") == [
+        "with x as (select 1 a from dual) select a from x",
+        "select 2 from dual",
+    ]
+
+
+def test_oracle_slash_only_counts_on_its_own_line():
+    assert split_oracle("select 4 / 2 from dual\n/\n") == ["select 4 / 2 from dual"]
+
+
+def test_oracle_script_runs_statement_by_statement():
+    script = "alter session set current_schema=HR;\nbegin p; end;\n/"
+    assert compile_script(script, "oracle").statements == (
+        "alter session set current_schema=HR",
+        "begin p; end;",
+    )
+
+
+# ---------- T-SQL ---------- #
+
+def test_tsql_go_splits_batches():
+    script = "set nocount on\nGO\nselect 1; select 2\ngo\n"
+    assert split_tsql(script) == ["set nocount on", "select 1; select 2"]
+
+
+def test_tsql_go_count_repeats_batch():
+    assert split_tsql("insert into t values (1)\nGO 3") == ["insert into t values (1)"] * 3
+
+
+def test_tsql_go_inside_strings_comments_and_names_is_ignored():
+    script = (
+        "select 'x\nGO\ny'\n"
+        "/* outer /* nested\nGO\n*/ still comment */\n"
+        "select [a\nGO\nb] from t\n"
+        "-- GO\n"
+        "GO -- end of batch\n"
+        "select 2"
+    )
+    batches = split_tsql(script)
+    assert len(batches) == 2
+    assert batches[1] == "select 2"
+
+
+def test_tsql_go_must_be_alone_on_its_line():
+    assert split_tsql("select 1 as go\nselect 2 as gone") == ["select 1 as go\nselect 2 as gone"]
+
+
+def test_empty_batches_are_dropped():
+    assert split_tsql("GO\n\nGO\n") == []
+    assert split_oracle(";\n/\n-- only a comment") == []
+
+
+# ---------- run_script ---------- #
+
+class FakeCursor:
+    def __init__(self):
+        self.executed = []
+        self.nextsets = 0
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def nextset(self):
+        self.nextsets += 1
+        return None
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.parametrize("dialect, script, expected", [
+    ("oracle", "select 1 from dual; select 2 from dual", ["select 1 from dual", "select 2 from dual"]),
+    ("mssql", "select 1\nGO\nselect 2", ["select 1", "select 2"]),
+    (None, "select 1; select 2", ["select 1", "select 2"]),
+])
+def test_run_script_executes_in_order_and_commits_once(dialect, script, expected):
+    conn, cur = FakeConnection(), FakeCursor()
+    run_script(conn, cur, script, dialect)
+    assert cur.executed == expected
+    assert conn.commits == 1
+    # Ara sonuçlar yalnızca MSSQL'de boşaltılır
+    assert cur.nextsets == (len(expected) if dialect == "mssql" else 0)
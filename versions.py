@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+versions tablosu için cache'li okuma.
+
+Login, change-password ve ana sayfa banner'ı her istekte repo'ya gitmez;
+liste VERSIONS_TTL saniye tutulur ve create_app() sırasında ısıtılır.
+Okuma hatası cache'lenmez, bir sonraki istek yeniden dener.
+"""
+from cache import TTLCache
+from config import VERSIONS_TTL
+from db import get_db
+
+_KEY = "versions"
+_cache = TTLCache(maxsize=1, ttl=VERSIONS_TTL)
+
+
+def get_versions():
+    """versions.line listesi; repo hatasında exception fırlatır."""
+    versions = _cache.get(_KEY)
+    if versions is None:
+        with get_db() as con, con.cursor() as cur:
+            cur.execute("SELECT line FROM versions")
+            versions = [r["line"] for r in cur.fetchall()]
+        _cache.set(_KEY, versions)
+    return list(versions)
+
+
+def get_version_line():
+    """Login ekranındaki tek satır; hata olursa boş string."""
+    try:
+        versions = get_versions()
+    except Exception:
+        return ""
+    return versions[0] if versions else ""
+
+
+def warm():
+    try:
+        get_versions()
+    except Exception:
+        pass
+
+
+def invalidate():
+    _cache.clear()